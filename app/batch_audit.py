@@ -0,0 +1,152 @@
+# backend/app/batch_audit.py
+"""Auditoria offline de uma árvore de diretórios, sem banco nem API.
+
+Uso:
+    python -m app.batch_audit /caminho/dos/arquivos -o resultados.jsonl [-w 8]
+
+Aplica as mesmas regras de app/services/analyses.py a cada PDF/DOCX/TXT,
+em paralelo (pool de processos), gravando uma linha JSON por arquivo assim
+que fica pronta. O checkpoint (padrão: <saida>.done) lista os arquivos já
+processados com sucesso; rodar de novo com a mesma saída retoma de onde parou
+e tenta outra vez os que deram erro (a saída ganha uma linha nova para eles).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterator, Set
+
+from .services.extraction import extract_text
+from .services.analyses import analyze_document
+from .services.rules import get_pack, load_pack_file
+
+DEFAULT_EXTENSIONS = (".pdf", ".docx", ".txt")
+_PROGRESS_EVERY = 5.0  # segundos
+
+def iter_files(root: str, extensions) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(extensions):
+                yield os.path.join(dirpath, name)
+
+def load_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as fh:
+        return {line.rstrip("\n") for line in fh if line.strip()}
+
+@lru_cache(maxsize=None)
+def resolve_pack(ref: str):
+    """Nome de pacote (app/rules, RULES_DIR) ou caminho para um .json.
+    Compilado uma vez por processo: o lote inteiro usa a mesma versão."""
+    return load_pack_file(ref) if ref.endswith(".json") else get_pack(ref)
+
+def audit_file(path: str, root: str, use_llm: bool, pack_ref: str) -> Dict[str, Any]:
+    """Executado no processo filho: lê, extrai e analisa um arquivo."""
+    rel = os.path.relpath(path, root)
+    try:
+        pack = resolve_pack(pack_ref)
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        text = extract_text(path, raw)
+        result = analyze_document({"id": rel, "title": os.path.basename(path), "content": text}, use_llm=use_llm, pack=pack)
+        return {"path": rel, "bytes": len(raw), "chars": len(text), "result": result}
+    except Exception as e:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        return {"path": rel, "bytes": size, "error": f"{type(e).__name__}: {e}"}
+
+class Throughput:
+    def __init__(self):
+        self.start = time.monotonic()
+        self.last_report = self.start
+        self.files = 0
+        self.errors = 0
+        self.bytes = 0
+
+    def add(self, rec: Dict[str, Any]) -> None:
+        self.files += 1
+        self.bytes += rec.get("bytes", 0)
+        if "error" in rec:
+            self.errors += 1
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        return (
+            f"{self.files} arquivos ({self.errors} erros) em {elapsed:.1f}s — "
+            f"{self.files / elapsed:.1f} arq/s, {self.bytes / elapsed / 1e6:.2f} MB/s"
+        )
+
+    def maybe_report(self) -> None:
+        now = time.monotonic()
+        if now - self.last_report >= _PROGRESS_EVERY:
+            self.last_report = now
+            print(self.line(), file=sys.stderr, flush=True)
+
+def run(root: str, output: str, checkpoint: str, workers: int, use_llm: bool, extensions, pack_ref: str) -> Throughput:
+    root = os.path.abspath(root)
+    done = load_checkpoint(checkpoint)
+    stats = Throughput()
+    pending = (p for p in iter_files(root, extensions) if os.path.relpath(p, root) not in done)
+    max_in_flight = workers * 4  # limita a fila: memória constante mesmo com milhões de arquivos
+
+    with open(output, "a", encoding="utf-8") as out, \
+            open(checkpoint, "a", encoding="utf-8") as ckpt, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                path = next(pending, None)
+                if path is None:
+                    exhausted = True
+                    break
+                in_flight.add(pool.submit(audit_file, path, root, use_llm, pack_ref))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                rec = fut.result()
+                out.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                # só marca como feito depois que a linha está gravada; erros ficam
+                # fora do checkpoint para a próxima execução tentar de novo
+                if "error" not in rec:
+                    ckpt.write(rec["path"] + "\n")
+                    ckpt.flush()
+                stats.add(rec)
+            stats.maybe_report()
+    return stats
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.batch_audit", description="Auditoria LGPD offline de diretórios.")
+    ap.add_argument("root", help="diretório a varrer (recursivo)")
+    ap.add_argument("-o", "--output", default="auditoria.jsonl", help="arquivo JSONL de saída (anexado)")
+    ap.add_argument("-c", "--checkpoint", default=None, help="arquivo de checkpoint (padrão: <output>.done)")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="processos em paralelo")
+    ap.add_argument("--ext", nargs="+", default=list(DEFAULT_EXTENSIONS), help="extensões consideradas")
+    ap.add_argument("-p", "--pack", default=None, help="pacote de regras (nome ou arquivo .json)")
+    ap.add_argument("--llm", action="store_true", help="refina com LLM (requer OPENAI_API_KEY e rede)")
+    args = ap.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        ap.error(f"diretório não encontrado: {args.root}")
+    checkpoint = args.checkpoint or args.output + ".done"
+    extensions = tuple(e.lower() if e.startswith(".") else "." + e.lower() for e in args.ext)
+
+    try:
+        pack = resolve_pack(args.pack) if args.pack else get_pack()
+    except (OSError, ValueError) as e:
+        ap.error(str(e))
+    print(f"Regras: {pack.stamp}", file=sys.stderr)
+    pack_ref = args.pack or pack.name
+
+    stats = run(args.root, args.output, checkpoint, max(args.workers, 1), args.llm, extensions, pack_ref)
+    print("Concluído: " + stats.line(), file=sys.stderr)
+    return 1 if stats.errors and stats.errors == stats.files else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,34 @@ from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
+    app_env: str = Field(default="development", alias="APP_ENV")  # "development" | "production"
+    auto_migrate: bool = Field(default=True, alias="AUTO_MIGRATE")
+    seed_admin: bool = Field(default=True, alias="SEED_ADMIN")
     database_url: str = Field(default="postgresql+psycopg2://postgres:postgres@db:5432/tcc_auditoria", alias="DATABASE_URL")
+    database_replica_urls: Optional[str] = Field(default=None, alias="DATABASE_REPLICA_URLS")  # separadas por vírgula
+    replica_retry_seconds: float = Field(default=30.0, alias="REPLICA_RETRY_SECONDS")
+    read_your_writes_seconds: float = Field(default=5.0, alias="READ_YOUR_WRITES_SECONDS")  # 0 desliga
     secret_key: str = Field(default="dev-secret", alias="SECRET_KEY")
     access_token_expire_minutes: int = Field(default=60, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     algorithm: str = Field(default="HS256", alias="ALGORITHM")
     cors_origins: List[str] = Field(default_factory=lambda: ["*"], alias="CORS_ORIGINS")
     openai_api_key: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", alias="OPENAI_MODEL")
+    content_codec: str = Field(default="zlib", alias="CONTENT_CODEC")  # "zlib" | "zstd" | "none"
+    document_page_chars: int = Field(default=4000, alias="DOCUMENT_PAGE_CHARS")
+    document_chunk_chars: int = Field(default=65536, alias="DOCUMENT_CHUNK_CHARS")
+    response_compress_min_bytes: int = Field(default=16384, alias="RESPONSE_COMPRESS_MIN_BYTES")
+    response_gzip_level: int = Field(default=5, alias="RESPONSE_GZIP_LEVEL")
+    response_brotli_quality: int = Field(default=4, alias="RESPONSE_BROTLI_QUALITY")
+    tracing_exporter: str = Field(default="none", alias="TRACING_EXPORTER")  # "none" | "file" | "http"
+    tracing_file: str = Field(default="traces.jsonl", alias="TRACING_FILE")
+    tracing_endpoint: str = Field(default="http://localhost:4318/v1/traces", alias="TRACING_ENDPOINT")
+    profile_token: Optional[str] = Field(default=None, alias="PROFILE_TOKEN")  # vazio = profiling desligado
+    profile_dir: str = Field(default="profiles", alias="PROFILE_DIR")
+    profile_interval_ms: float = Field(default=5.0, alias="PROFILE_INTERVAL_MS")
+    default_rule_pack: str = Field(default="lgpd", alias="DEFAULT_RULE_PACK")
+    rules_dir: Optional[str] = Field(default=None, alias="RULES_DIR")  # pacotes por cliente
+    rules_reload_seconds: float = Field(default=2.0, alias="RULES_RELOAD_SECONDS")
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore", case_sensitive=False)
 
 settings = Settings()
@@ -1,8 +1,30 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import itertools
+import logging
+import time
+from typing import List, Optional, Sequence
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from .config import settings
+from .utils import tracing
+
+logger = logging.getLogger("app.db")
+
+def _make_engine(url: str) -> Engine:
+    eng = create_engine(url, pool_pre_ping=True)
+    if eng.dialect.name == "sqlite":
+        # SQLite (testes locais) só respeita ON DELETE CASCADE com a pragma ligada
+        @event.listens_for(eng, "connect")
+        def _sqlite_fk_pragma(dbapi_conn, _):
+            dbapi_conn.execute("PRAGMA foreign_keys=ON")
+    if tracing.instrumented():
+        tracing.instrument_engine(eng)
+    return eng
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+engine = _make_engine(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
@@ -13,6 +35,108 @@ def get_db():
     finally:
         db.close()
 
-def init_db():
+# =============================
+# Réplicas de leitura
+# =============================
+def _label(eng: Engine) -> str:
+    return eng.url.host or eng.url.database or str(eng.url)
+
+class ReplicaPool:
+    """Réplicas em round-robin. Não há sonda por requisição: a sessão de leitura
+    faz o checkout da conexão dela logo de início (o pool_pre_ping já testa essa
+    conexão) e, se falhar, marca a réplica fora por `cooldown` segundos e tenta a
+    próxima. Vencido o cooldown, a próxima leitura nela serve de nova sonda."""
+
+    def __init__(self, urls: List[str], cooldown: float):
+        self.engines = [_make_engine(u) for u in urls]
+        self.cooldown = cooldown
+        self._down_until = [0.0] * len(self.engines)
+        self._next = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self, skip: Sequence[Engine] = ()) -> Optional[Engine]:
+        n = len(self.engines)
+        if not n:
+            return None
+        start = next(self._next)
+        now = time.monotonic()
+        for i in range(n):
+            idx = (start + i) % n
+            eng = self.engines[idx]
+            if self._down_until[idx] <= now and eng not in skip:
+                return eng
+        return None
+
+    def mark_down(self, eng: Engine, error: BaseException) -> None:
+        idx = self.engines.index(eng)
+        self._down_until[idx] = time.monotonic() + self.cooldown
+        logger.warning("réplica %s indisponível por %ss: %s", _label(eng), self.cooldown, getattr(error, "orig", error))
+
+    def status(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {"host": _label(eng), "healthy": self._down_until[i] <= now}
+            for i, eng in enumerate(self.engines)
+        ]
+
+    def dispose(self) -> None:
+        for eng in self.engines:
+            eng.dispose(close=False)
+
+replicas = ReplicaPool(
+    [u.strip() for u in (settings.database_replica_urls or "").split(",") if u.strip()],
+    settings.replica_retry_seconds,
+)
+
+# Depois de uma escrita o cliente recebe o instante dela (cookie/cabeçalho);
+# dentro da janela, as leituras dele vão ao primário para não ver dado atrasado.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+def wrote_recently(request: Request) -> bool:
+    raw = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)
+    try:
+        return time.time() - float(raw) < settings.read_your_writes_seconds
+    except (TypeError, ValueError):
+        return False
+
+def read_session(primary: bool = False) -> Session:
+    """Sessão de leitura já com a conexão em mãos: numa réplica fora do ar o erro
+    aparece aqui (e a leitura passa para outra réplica ou para o primário), não
+    no meio da rota."""
+    tried: List[Engine] = []
+    while not primary:
+        eng = replicas.pick(skip=tried)
+        if eng is None:
+            break
+        db = SessionLocal(bind=eng)
+        try:
+            db.connection()
+            return db
+        except DBAPIError as e:
+            db.close()
+            replicas.mark_down(eng, e)
+            tried.append(eng)
+    return SessionLocal()
+
+def get_read_db(request: Request):
+    """Sessão para rotas só de leitura: réplica, salvo escrita recente do cliente."""
+    db = read_session(primary=wrote_recently(request))
+    try:
+        yield db
+    except DBAPIError as e:
+        # conexão perdida no meio da consulta: as próximas leituras evitam a réplica
+        eng = db.get_bind()
+        if e.connection_invalidated and eng is not engine:
+            replicas.mark_down(eng, e)
+        raise
+    finally:
+        db.close()
+
+def init_db() -> bool:
+    """Confere a versão do esquema; só cria/migra quando ela mudou."""
     import app.models  # Importa todos os modelos para que eles sejam registrados no Base
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from .migrations import ensure_schema
+    return ensure_schema(engine, auto_migrate=settings.auto_migrate)
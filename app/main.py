@@ -1,9 +1,16 @@
+from .utils import startup  # primeiro import: marca o início do cold start
+import time
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
-from .routers import auth, projects, documents, analyses, reports
-from .db import init_db
+from fastapi import FastAPI, Request
+from .routers import auth, projects, documents, analyses, reports, rules
+from .db import init_db, replicas, LAST_WRITE_COOKIE, LAST_WRITE_HEADER
+from .config import settings
+from .services.purge import resume_pending_purges
+from .utils.serialization import FastJSONResponse
+from .utils import tracing
+from .utils.profiling import trace_requests
 
-app = FastAPI(title="TCC Auditoria & Conformidade — API")
+app = FastAPI(title="TCC Auditoria & Conformidade — API", default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,15 +20,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if tracing.instrumented():
+    app.middleware("http")(trace_requests)
+
+if replicas and settings.read_your_writes_seconds > 0:
+    @app.middleware("http")
+    async def mark_writes(request: Request, call_next):
+        # marca o instante da escrita para as próximas leituras irem ao primário
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            stamp = f"{time.time():.3f}"
+            response.set_cookie(LAST_WRITE_COOKIE, stamp, max_age=int(settings.read_your_writes_seconds) + 1, httponly=True, samesite="lax")
+            response.headers[LAST_WRITE_HEADER] = stamp
+        return response
+
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
-    auth.seed_user()
+    # sob gunicorn o mestre já fez esquema e seed (gunicorn.conf.py: on_starting)
+    if not startup.prepared_by_master:
+        with startup.phase("schema"):
+            init_db()
+        with startup.phase("seed"):
+            auth.seed_user()
+    resume_pending_purges()
+    startup.record_ready()
+
+@app.get("/health", tags=["health"])
+def health():
+    return {"status": "ok", "env": settings.app_env, "startup": startup.summary, "replicas": replicas.status()}
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(projects.router, prefix="/projects", tags=["projects"])
 app.include_router(documents.router, prefix="/documents", tags=["documents"])
 app.include_router(analyses.router, prefix="/analyses", tags=["analyses"])
 app.include_router(reports.router, prefix="/reports", tags=["reports"])
+app.include_router(rules.router, prefix="/rules", tags=["rules"])
 app.include_router(analyses.router)
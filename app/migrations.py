@@ -0,0 +1,402 @@
+# backend/app/migrations.py
+# Passos de atualização de esquema/dados que o create_all não cobre.
+# Cada passo deve ser idempotente. O banco guarda a "impressão digital" do
+# esquema aplicado (tabela schema_version); se ela bate com a do código, a
+# inicialização não faz nada além de uma consulta.
+# Lotes são confirmados um a um para não segurar uma transação longa em tabelas grandes.
+#
+# Uso fora da API:
+#   python -m app.migrations upgrade | current
+#   python -m app.migrations partition-documents [N]   (PostgreSQL, opcional)
+#   python -m app.migrations check-plans                (falha se consulta quente perder o índice)
+import hashlib
+import sys
+from typing import Optional
+
+from sqlalchemy import inspect, text, MetaData, Table, Column, String, DateTime, func
+from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.schema import AddConstraint, CheckConstraint, ForeignKeyConstraint, UniqueConstraint
+
+from .config import settings
+from .utils.compression import compress_text
+from .utils.pagination import paginate_text, chunk_pages
+
+_BATCH_SIZE = 500
+
+def _columns(conn: Connection, table: str) -> set:
+    insp = inspect(conn)
+    if not insp.has_table(table):
+        return set()
+    return {c["name"] for c in insp.get_columns(table)}
+
+def migrate_legacy_document_content(engine: Engine) -> int:
+    """Move `documents.content` (texto puro, legado) para `document_contents` comprimido."""
+    with engine.connect() as conn:
+        if "content" not in _columns(conn, "documents"):
+            return 0
+    moved = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT d.id, d.content FROM documents d "
+                    "WHERE d.content IS NOT NULL AND NOT EXISTS "
+                    "(SELECT 1 FROM document_contents c WHERE c.document_id = d.id) "
+                    "ORDER BY d.id LIMIT :n"
+                ),
+                {"n": _BATCH_SIZE},
+            ).all()
+            if not rows:
+                break
+            payload = []
+            for doc_id, content in rows:
+                pages = paginate_text(content, settings.document_page_chars)
+                for page, part, start, chunk in chunk_pages(pages, settings.document_chunk_chars):
+                    codec, data = compress_text(chunk, settings.content_codec)
+                    payload.append({
+                        "document_id": doc_id,
+                        "page": page,
+                        "part": part,
+                        "char_start": start,
+                        "char_len": len(chunk),
+                        "codec": codec,
+                        "raw_size": len(chunk.encode("utf-8")),
+                        "data": data,
+                    })
+            conn.execute(
+                text(
+                    "INSERT INTO document_contents "
+                    "(document_id, page, part, char_start, char_len, codec, raw_size, data) "
+                    "VALUES (:document_id, :page, :part, :char_start, :char_len, :codec, :raw_size, :data)"
+                ),
+                payload,
+            )
+            moved += len(rows)
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE documents DROP COLUMN content"))
+    return moved
+
+def add_missing_columns(engine: Engine) -> int:
+    """Acrescenta colunas novas dos modelos em tabelas já existentes (sempre anuláveis;
+    valores padrão ficam a cargo do ORM)."""
+    from .db import Base
+    added = 0
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = _columns(conn, table.name)
+            if not existing:
+                continue
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                ddl_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {ddl_type}'))
+                added += 1
+    return added
+
+def create_missing_indexes(engine: Engine) -> int:
+    from .db import Base
+    created = 0
+    with engine.begin() as conn:
+        insp = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {ix["name"] for ix in insp.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created += 1
+    return created
+
+def documents_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'documents' AND pg_table_is_visible(c.oid)"
+    )).scalar())
+
+def sync_foreign_key_actions(engine: Engine) -> int:
+    """Recria FKs cujo ON DELETE no banco difere do declarado nos modelos
+    (ex.: CASCADE em documents.project_id). Só PostgreSQL altera constraints."""
+    if engine.dialect.name != "postgresql":
+        return 0
+    from .db import Base
+    changed = 0
+    with engine.begin() as conn:
+        insp = inspect(conn)
+        partitioned = documents_partitioned(conn)
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = insp.get_foreign_keys(table.name)
+            for fk in table.foreign_key_constraints:
+                if partitioned and fk.referred_table.name == "documents":
+                    # sem chave única só em `id` não há FK para documents particionada;
+                    # a exclusão dos filhos fica com o gatilho documents_delete_children
+                    continue
+                cols = [c.name for c in fk.columns]
+                current = next(
+                    (e for e in existing
+                     if e["constrained_columns"] == cols and e["referred_table"] == fk.referred_table.name),
+                    None,
+                )
+                want = (fk.ondelete or "").upper() or None
+                have = ((current or {}).get("options") or {}).get("ondelete")
+                have = have.upper() if have else None
+                if current is not None and have == want:
+                    continue
+                if current is not None:
+                    conn.execute(text(f'ALTER TABLE {table.name} DROP CONSTRAINT "{current["name"]}"'))
+                conn.execute(AddConstraint(fk))
+                changed += 1
+    return changed
+
+# Com `documents` particionada não há FK dos filhos para documents.id; este gatilho
+# faz o papel do ON DELETE (CASCADE nos blocos/features, SET NULL nos achados),
+# inclusive quando o projeto é apagado fora do purge (cascata de documents.project_id).
+_DOCUMENTS_DELETE_TRIGGER = """
+CREATE OR REPLACE FUNCTION documents_delete_children() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM document_contents WHERE document_id = OLD.id;
+    DELETE FROM document_features WHERE document_id = OLD.id;
+    UPDATE analysis_findings SET document_id = NULL WHERE document_id = OLD.id;
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql
+"""
+
+def _partitioned_documents_support(conn: Connection) -> None:
+    conn.execute(text(_DOCUMENTS_DELETE_TRIGGER))
+    conn.execute(text("DROP TRIGGER IF EXISTS documents_delete_children ON documents"))
+    conn.execute(text(
+        "CREATE TRIGGER documents_delete_children AFTER DELETE ON documents "
+        "FOR EACH ROW EXECUTE FUNCTION documents_delete_children()"
+    ))
+    # busca só por id (rotas /documents/detail/{id}) não tem a chave de partição:
+    # sem este índice seria seq scan em cada partição; com ele, uma sonda por partição
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_documents_id ON documents (id)"))
+
+def sync_partitioned_documents(engine: Engine) -> int:
+    """Gatilho de limpeza dos filhos e índice por id em `documents` particionada."""
+    if engine.dialect.name != "postgresql":
+        return 0
+    with engine.begin() as conn:
+        if not documents_partitioned(conn):
+            return 0
+        _partitioned_documents_support(conn)
+    return 1
+
+def backfill_document_features(engine: Engine) -> int:
+    """Calcula a forma normalizada de documentos sem features (ou de outra versão
+    do normalizador)."""
+    from sqlalchemy.orm import Session, selectinload
+    from .models import Document, DocumentFeatures
+    from .utils.normalize import NORMALIZER_VERSION
+
+    done = 0
+    last_id = 0
+    while True:
+        with Session(engine) as db:
+            docs = (
+                db.query(Document)
+                .outerjoin(DocumentFeatures)
+                .options(selectinload(Document.chunks), selectinload(Document.features))
+                .filter(Document.id > last_id)
+                .filter(
+                    (DocumentFeatures.document_id.is_(None))
+                    | (DocumentFeatures.normalizer_version != NORMALIZER_VERSION)
+                )
+                .order_by(Document.id)
+                .limit(_BATCH_SIZE // 5)
+                .all()
+            )
+            if not docs:
+                break
+            for d in docs:
+                d.refresh_features()
+            last_id = docs[-1].id
+            done += len(docs)
+            db.commit()
+    return done
+
+def backfill_project_stats(engine: Engine) -> int:
+    """Cria a linha de estatísticas dos projetos que ainda não têm uma."""
+    from sqlalchemy.orm import Session
+    from .models import Project, ProjectStats
+    from .services.stats import rebuild_stats
+
+    done = 0
+    with Session(engine) as db:
+        missing = [
+            pid for (pid,) in db.query(Project.id)
+            .outerjoin(ProjectStats, ProjectStats.project_id == Project.id)
+            .filter(ProjectStats.project_id.is_(None))
+            .order_by(Project.id)
+        ]
+    for pid in missing:
+        with Session(engine) as db:
+            rebuild_stats(db, pid)
+            db.commit()
+            done += 1
+    return done
+
+STEPS = [
+    migrate_legacy_document_content,
+    add_missing_columns,
+    create_missing_indexes,
+    sync_foreign_key_actions,
+    sync_partitioned_documents,
+    backfill_document_features,
+    backfill_project_stats,
+]
+
+def partition_documents(engine: Engine, partitions: int = 16) -> int:
+    """Converte `documents` em tabela particionada por HASH(project_id), em uma
+    transação. A chave primária passa a ser (project_id, id) e as FKs de
+    document_contents/document_features/analysis_findings para documents.id são
+    removidas (PostgreSQL exige a chave de partição em toda chave única); um
+    gatilho AFTER DELETE em documents assume a limpeza desses filhos.
+    Limites: consultas só por id não podem podar partições (usam ix_documents_id,
+    uma sonda por partição); as que têm project_id leem uma partição só.
+    Para bases muito grandes; bloqueia a tabela durante a cópia. Sem volta."""
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError("Particionamento só é suportado no PostgreSQL")
+    with engine.begin() as conn:
+        if documents_partitioned(conn):
+            return 0
+        insp = inspect(conn)
+        for child in ("document_contents", "document_features", "analysis_findings"):
+            for fk in insp.get_foreign_keys(child):
+                if fk["referred_table"] == "documents":
+                    conn.execute(text(f'ALTER TABLE {child} DROP CONSTRAINT "{fk["name"]}"'))
+        for ix in insp.get_indexes("documents"):
+            conn.execute(text(f'DROP INDEX IF EXISTS "{ix["name"]}"'))
+        pk = insp.get_pk_constraint("documents").get("name")
+        conn.execute(text("ALTER TABLE documents RENAME TO documents_unpartitioned"))
+        if pk:  # libera o nome do índice da PK para a tabela nova
+            conn.execute(text(f'ALTER TABLE documents_unpartitioned RENAME CONSTRAINT "{pk}" TO documents_unpartitioned_pkey'))
+        conn.execute(text(
+            "CREATE TABLE documents (LIKE documents_unpartitioned INCLUDING DEFAULTS, "
+            "PRIMARY KEY (project_id, id)) PARTITION BY HASH (project_id)"
+        ))
+        for i in range(partitions):
+            conn.execute(text(
+                f"CREATE TABLE documents_p{i} PARTITION OF documents "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+            ))
+        conn.execute(text("INSERT INTO documents SELECT * FROM documents_unpartitioned"))
+        # a sequência do id (serial) passa a pertencer à nova tabela antes do DROP
+        seq = conn.execute(text("SELECT pg_get_serial_sequence('documents_unpartitioned', 'id')")).scalar()
+        if seq:
+            conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY documents.id"))
+        conn.execute(text("DROP TABLE documents_unpartitioned"))
+        conn.execute(text(
+            "ALTER TABLE documents ADD CONSTRAINT documents_project_id_fkey "
+            "FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE"
+        ))
+        from .models import Document
+        for index in Document.__table__.indexes:
+            index.create(conn)
+        _partitioned_documents_support(conn)
+    return partitions
+
+_version_meta = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_meta,
+    Column("fingerprint", String(64), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+def _constraint_signature(constraint) -> str:
+    if isinstance(constraint, ForeignKeyConstraint):
+        targets = [fk.target_fullname for fk in constraint.elements]
+        return f"fk:{constraint.column_keys}:{targets}:{constraint.ondelete}:{constraint.onupdate}"
+    if isinstance(constraint, UniqueConstraint):
+        return f"uq:{constraint.name}:{[c.name for c in constraint.columns]}"
+    if isinstance(constraint, CheckConstraint):
+        return f"ck:{constraint.name}:{constraint.sqltext}"
+    return f"{type(constraint).__name__}:{[c.name for c in constraint.columns]}"
+
+def schema_fingerprint() -> str:
+    """Hash do esquema declarado nos modelos + lista de passos: muda sozinho
+    quando um modelo ou passo muda, sem número de versão para esquecer."""
+    from .db import Base
+    import app.models  # noqa: F401 — registra os modelos no Base
+    h = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        h.update(table.name.encode())
+        for col in table.columns:
+            default = col.server_default.arg if col.server_default is not None else None
+            h.update(f"{col.name}:{col.type!r}:{col.nullable}:{col.primary_key}:{default}".encode())
+        for ix in sorted(table.indexes, key=lambda i: i.name or ""):
+            h.update(f"ix:{ix.name}:{ix.unique}:{[c.name for c in ix.columns]}".encode())
+        # FKs com a ação (ondelete muda -> sync_foreign_key_actions roda), únicas e checks
+        for line in sorted(_constraint_signature(c) for c in table.constraints):
+            h.update(line.encode())
+    for step in STEPS:
+        h.update(step.__name__.encode())
+    return h.hexdigest()
+
+def current_fingerprint(engine: Engine) -> Optional[str]:
+    with engine.connect() as conn:
+        if not inspect(conn).has_table("schema_version"):
+            return None
+        return conn.execute(
+            text("SELECT fingerprint FROM schema_version ORDER BY applied_at DESC LIMIT 1")
+        ).scalar()
+
+def run_migrations(engine: Engine) -> None:
+    for step in STEPS:
+        step(engine)
+
+def upgrade(engine: Engine) -> str:
+    from .db import Base
+    import app.models  # noqa: F401
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    fp = schema_fingerprint()
+    _version_meta.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(schema_version.delete())
+        conn.execute(schema_version.insert().values(fingerprint=fp))
+    return fp
+
+def ensure_schema(engine: Engine, auto_migrate: bool = True) -> bool:
+    """Devolve True se precisou migrar. Com auto_migrate=False, um esquema
+    desatualizado impede a subida (rode `python -m app.migrations upgrade`)."""
+    if current_fingerprint(engine) == schema_fingerprint():
+        return False
+    if not auto_migrate:
+        raise RuntimeError("Esquema do banco desatualizado: rode `python -m app.migrations upgrade`")
+    upgrade(engine)
+    return True
+
+def main(argv=None) -> int:
+    from .db import engine
+    args = sys.argv[1:] if argv is None else argv
+    cmd = args[0] if args else "upgrade"
+    if cmd == "current":
+        print(f"banco:  {current_fingerprint(engine)}")
+        print(f"código: {schema_fingerprint()}")
+        return 0
+    if cmd == "upgrade":
+        print(f"esquema em {upgrade(engine)}")
+        return 0
+    if cmd == "partition-documents":
+        n = int(args[1]) if len(args) > 1 else 16
+        done = partition_documents(engine, n)
+        print(f"documents particionada em {n} partições" if done else "documents já está particionada")
+        return 0
+    if cmd == "check-plans":
+        from .query_plans import check_plans, report
+        failures = check_plans(engine)
+        report(failures)
+        return 1 if failures else 0
+    print("uso: python -m app.migrations [upgrade|current|partition-documents [N]|check-plans]", file=sys.stderr)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,16 @@
+import zlib
+from datetime import datetime, timezone
+from typing import List
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, ForeignKey, Text, DateTime, func
+from sqlalchemy import String, Integer, BigInteger, Boolean, ForeignKey, Text, DateTime, LargeBinary, JSON, Index, func
 from .db import Base
+from .config import settings
+from .utils.compression import compress_text, decompress_text
+from .utils.pagination import paginate_text, chunk_pages
+from .utils.normalize import NormalizedText, OffsetMap, normalize_text, NORMALIZER_VERSION
+
+PROJECT_ACTIVE = "active"
+PROJECT_DELETING = "deleting"
 
 class User(Base):
     __tablename__ = "users"
@@ -8,24 +18,178 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     password_hash: Mapped[str] = mapped_column(String(255))
 
-class Project(Base):
+class Versioned:
+    """Versão da linha para ETag/Last-Modified. Edições que só mexem em tabelas
+    filhas (blocos de conteúdo) precisam chamar touch()."""
+    revision: Mapped[int | None] = mapped_column(Integer, default=1, nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=True
+    )
+
+    def touch(self) -> None:
+        self.revision = (self.revision or 1) + 1
+        self.updated_at = datetime.now(timezone.utc)
+
+class Project(Versioned, Base):
     __tablename__ = "projects"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), index=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    rule_pack: Mapped[str | None] = mapped_column(String(64), nullable=True)  # None = pacote padrão
+    # "deleting" = exclusão em andamento (tombstone); some das listagens na hora
+    status: Mapped[str | None] = mapped_column(String(20), default=PROJECT_ACTIVE, nullable=True)
 
-class Document(Base):
+class Document(Versioned, Base):
     __tablename__ = "documents"
+    # toda consulta quente filtra por projeto e ordena por id (ou data):
+    # listagem, análise, relatório, versões para ETag
+    __table_args__ = (
+        Index("ix_documents_project_id_id", "project_id", "id"),
+        Index("ix_documents_project_id_created_at", "project_id", "created_at"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
     title: Mapped[str] = mapped_column(String(255))
-    content: Mapped[str] = mapped_column(Text)
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now()) 
+    # corpo fica em tabela separada, comprimido e dividido em páginas/blocos;
+    # só é carregado quando `content` é acessado (ou via app.services.content por faixa)
+    chunks: Mapped[List["DocumentContent"]] = relationship(
+        back_populates="document",
+        lazy="select",
+        cascade="all, delete-orphan",
+        passive_deletes=True,  # exclusão do documento não carrega os blocos: o banco apaga
+        order_by="(DocumentContent.page, DocumentContent.part)",
+    )
+
+    # forma normalizada + estatísticas, calculadas uma vez na ingestão
+    features: Mapped["DocumentFeatures | None"] = relationship(
+        back_populates="document", uselist=False, lazy="select", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    @property
+    def content(self) -> str:
+        return "".join(c.text for c in self.chunks)
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self.set_pages(paginate_text(value or "", settings.document_page_chars))
+
+    def set_pages(self, pages: List[str]) -> None:
+        self.chunks = [
+            DocumentContent(page=page, part=part, char_start=start, text=text)
+            for page, part, start, text in chunk_pages(pages, settings.document_chunk_chars)
+        ]
+
+    def refresh_features(self, text: str | None = None) -> None:
+        nt = normalize_text(self.content if text is None else text)
+        if self.features is None:
+            self.features = DocumentFeatures()
+        self.features.set_normalized(nt)
+
+class DocumentContent(Base):
+    __tablename__ = "document_contents"
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    page: Mapped[int] = mapped_column(Integer, primary_key=True)
+    part: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+    char_start: Mapped[int] = mapped_column(Integer)
+    char_len: Mapped[int] = mapped_column(Integer, default=0)
+    codec: Mapped[str] = mapped_column(String(16))
+    raw_size: Mapped[int] = mapped_column(Integer, default=0)
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    document: Mapped["Document"] = relationship(back_populates="chunks")
+
+    @property
+    def text(self) -> str:
+        return decompress_text(self.codec, self.data)
+
+    @text.setter
+    def text(self, value: str) -> None:
+        value = value or ""
+        self.codec, self.data = compress_text(value, settings.content_codec)
+        self.char_len = len(value)
+        self.raw_size = len(value.encode("utf-8"))
+
+class DocumentFeatures(Base):
+    __tablename__ = "document_features"
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    normalizer_version: Mapped[str] = mapped_column(String(16))
+    codec: Mapped[str] = mapped_column(String(16))
+    normalized_data: Mapped[bytes] = mapped_column(LargeBinary)
+    offsets_data: Mapped[bytes] = mapped_column(LargeBinary)
+    char_count: Mapped[int] = mapped_column(Integer, default=0)
+    normalized_chars: Mapped[int] = mapped_column(Integer, default=0)
+    token_count: Mapped[int] = mapped_column(Integer, default=0)
+    unique_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    line_count: Mapped[int] = mapped_column(Integer, default=0)
+    document: Mapped["Document"] = relationship(back_populates="features")
+
+    def set_normalized(self, nt: NormalizedText) -> None:
+        self.normalizer_version = NORMALIZER_VERSION
+        self.codec, self.normalized_data = compress_text(nt.text, settings.content_codec)
+        self.offsets_data = zlib.compress(nt.offsets.to_bytes())
+        for k, v in nt.stats.items():
+            setattr(self, k, v)
+
+    @property
+    def normalized(self) -> NormalizedText:
+        offsets = OffsetMap.from_bytes(zlib.decompress(self.offsets_data))
+        return NormalizedText(decompress_text(self.codec, self.normalized_data), offsets)
 
 class Analysis(Base):
+    """Uma execução de análise sobre (parte de) um projeto; os achados por documento
+    ficam em AnalysisFinding e os agregados do projeto em `rollup`."""
     __tablename__ = "analyses"
+    __table_args__ = (Index("ix_analyses_project_id_id", "project_id", "id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    finished_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
     status: Mapped[str] = mapped_column(String(50), default="completed")
     summary: Mapped[str] = mapped_column(Text)
+    document_count: Mapped[int] = mapped_column(Integer, default=0)
+    rollup: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    rules_version: Mapped[str | None] = mapped_column(String(100), nullable=True)  # "nome@hash"
+    # False = run só de alguns documentos (document_ids): não vira o relatório do projeto.
+    # NULL (runs anteriores à coluna) conta como projeto inteiro.
+    full_project: Mapped[bool | None] = mapped_column(Boolean, default=True, nullable=True)
+    # ProjectStats.documents_revision no início do run; diferente do atual = documentos mudaram
+    documents_revision: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    findings: Mapped[List["AnalysisFinding"]] = relationship(
+        back_populates="analysis", cascade="all, delete-orphan", passive_deletes=True, order_by="AnalysisFinding.id"
+    )
+
+class AnalysisFinding(Base):
+    __tablename__ = "analysis_findings"
+    __table_args__ = (
+        Index("ix_analysis_findings_analysis_id_id", "analysis_id", "id"),
+        # ON DELETE SET NULL / gatilho de documents: sem índice, varredura a cada exclusão
+        Index("ix_analysis_findings_document_id", "document_id"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    analysis_id: Mapped[int] = mapped_column(ForeignKey("analyses.id", ondelete="CASCADE"))
+    # histórico sobrevive à exclusão do documento
+    document_id: Mapped[int | None] = mapped_column(ForeignKey("documents.id", ondelete="SET NULL"), nullable=True)
+    title: Mapped[str] = mapped_column(String(255))
+    document_created_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # revisão do documento analisada: os offsets das evidências só valem para ela
+    document_revision: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    severity: Mapped[str] = mapped_column(String(20), index=True)
+    pii_counts: Mapped[dict] = mapped_column(JSON, default=dict)
+    keyword_buckets: Mapped[dict] = mapped_column(JSON, default=dict)
+    recommendations: Mapped[list] = mapped_column(JSON, default=list)
+    result: Mapped[dict] = mapped_column(JSON)
+    analysis: Mapped["Analysis"] = relationship(back_populates="findings")
+
+class ProjectStats(Versioned, Base):
+    """Agregados do projeto para o painel, mantidos incrementalmente
+    (app.services.stats) em vez de recalculados a cada leitura."""
+    __tablename__ = "project_stats"
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    document_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_bytes: Mapped[int] = mapped_column(BigInteger, default=0)  # texto sem compressão (UTF-8)
+    # +1 a cada documento criado, editado (inclusive só o título) ou removido
+    documents_revision: Mapped[int | None] = mapped_column(Integer, default=0, nullable=True)
+    # da última análise do projeto inteiro
+    pii_totals: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    severity_histogram: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    last_analysis_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,92 @@
+# backend/app/query_plans.py
+# Verificação de regressão de planos: roda EXPLAIN nas consultas quentes e falha
+# se alguma passar a varrer a tabela inteira em vez de usar um índice.
+# No PostgreSQL o seq scan é desencorajado (enable_seqscan=off), então um
+# "Seq Scan" no plano significa que não existe índice utilizável — não que a
+# tabela de teste é pequena demais para valer a pena.
+#
+#   python -m app.migrations check-plans
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from .models import Analysis, AnalysisFinding, Document, DocumentContent, Project, ProjectStats
+
+def hot_queries() -> Dict[str, object]:
+    """Mesmas formas das consultas das rotas (valores fixos; só o plano importa)."""
+    return {
+        "list_documents": select(Document.id, Document.project_id, Document.title, Document.created_at)
+        .where(Document.project_id == 1)
+        .order_by(Document.id.desc()),
+        "documents_version": select(func.count(Document.id), func.max(Document.id), func.sum(Document.revision))
+        .where(Document.project_id == 1),
+        "documents_by_created_at": select(Document.id)
+        .where(Document.project_id == 1)
+        .order_by(Document.created_at.desc()),
+        "run_analysis_documents": select(Document.id)
+        .where(Document.project_id == 1, Document.id.in_([1, 2, 3]))
+        .order_by(Document.id.desc()),
+        "document_chunks": select(DocumentContent.page, DocumentContent.part)
+        .where(DocumentContent.document_id == 1)
+        .order_by(DocumentContent.page, DocumentContent.part),
+        "latest_run": select(Analysis.id)
+        .where(Analysis.project_id == 1, Analysis.status == "completed", Analysis.full_project.is_not(False))
+        .order_by(Analysis.id.desc())
+        .limit(1),
+        "run_findings": select(AnalysisFinding.id)
+        .where(AnalysisFinding.analysis_id == 1)
+        .order_by(AnalysisFinding.id),
+        "project_stats": select(ProjectStats.document_count).where(ProjectStats.project_id == 1),
+        "project_by_id": select(Project.name).where(Project.id == 1),
+    }
+
+def _sql(conn: Connection, stmt) -> str:
+    return str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+def _pg_seq_scans(node: dict, found: List[str]) -> List[str]:
+    kind = node.get("Node Type")
+    # Index Scan sem "Index Cond" percorre o índice inteiro (ex.: só para o ORDER BY)
+    if kind == "Seq Scan" or (kind in ("Index Scan", "Index Only Scan") and not node.get("Index Cond")):
+        found.append(node.get("Relation Name", "?"))
+    for child in node.get("Plans") or []:
+        _pg_seq_scans(child, found)
+    return found
+
+def explain(conn: Connection, stmt) -> Tuple[List[str], str]:
+    """(tabelas varridas por completo — direto ou pelo índice inteiro, plano em texto)."""
+    sql = _sql(conn, stmt)
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        root = (plan[0] if isinstance(plan, list) else plan)["Plan"]
+        text_plan = "\n".join(r[0] for r in conn.execute(text(f"EXPLAIN {sql}")))
+        return _pg_seq_scans(root, []), text_plan
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        details = [r[-1] for r in rows]
+        # só "SEARCH t USING ..." é acesso pelo índice; "SCAN t" e "SCAN t USING (COVERING)
+        # INDEX ix" percorrem a tabela ou o índice inteiro (ex.: índice usado só no ORDER BY)
+        scans = [d.split()[1] for d in details if d.startswith("SCAN ")]
+        return scans, "\n".join(details)
+    raise RuntimeError(f"check-plans não suporta {conn.dialect.name}")
+
+def check_plans(engine: Engine) -> List[Tuple[str, List[str], str]]:
+    failures = []
+    with engine.connect() as conn:
+        for name, stmt in hot_queries().items():
+            with conn.begin():
+                scans, plan = explain(conn, stmt)
+            if scans:
+                failures.append((name, scans, plan))
+    return failures
+
+def report(failures: List[Tuple[str, List[str], str]]) -> None:
+    total = len(hot_queries())
+    if not failures:
+        print(f"ok: {total} consultas quentes usam índice")
+        return
+    for name, scans, plan in failures:
+        print(f"FALHA {name}: varredura completa em {', '.join(scans)}")
+        print("  " + plan.replace("\n", "\n  "))
+    print(f"{len(failures)}/{total} consultas sem índice")
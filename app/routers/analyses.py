@@ -1,11 +1,13 @@
 # backend/app/routers/analyses.py
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from ..db import SessionLocal
-from ..models import Project, Document
+from ..models import Project, Document, PROJECT_DELETING
 from ..schemas import AnalysisRunIn, AnalysisDocResult
-from ..services.analyses import analyze_document
+from ..services.runs import run_project_analysis, run_findings, doc_results
+from ..services.rules import RulePackError
+from ..utils.serialization import DOC_RESULTS, fast_response
 
 router = APIRouter(prefix="/analyses", tags=["analyses"])
 
@@ -17,30 +19,19 @@ def get_db():
         db.close()
 
 @router.post("/run", response_model=List[AnalysisDocResult])
-def run_analysis(payload: AnalysisRunIn, db: Session = Depends(get_db)):
-    project = db.query(Project).filter_by(id=payload.project_id).first()
+def run_analysis(payload: AnalysisRunIn, request: Request, db: Session = Depends(get_db)):
+    project = db.query(Project).filter(Project.id == payload.project_id, Project.status.is_distinct_from(PROJECT_DELETING)).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    q = db.query(Document).filter_by(project_id=payload.project_id)
+    q = db.query(Document.id).filter_by(project_id=payload.project_id)
     if payload.document_ids:
         q = q.filter(Document.id.in_(payload.document_ids))
-    docs = q.order_by(Document.id.desc()).all()
-    if not docs:
+    if not q.first():
         raise HTTPException(status_code=400, detail="No documents to analyze")
 
-    results: List[AnalysisDocResult] = []
-    for d in docs:
-        result = analyze_document({
-            "id": d.id,
-            "title": d.title,
-            "content": d.content,
-            "created_at": d.created_at,
-        })
-        results.append({
-            "document_id": d.id,
-            "title": d.title,
-            "created_at": d.created_at,
-            "result": result,
-        })
-    return results
+    try:
+        run = run_project_analysis(db, payload.project_id, payload.document_ids)
+    except RulePackError as e:  # pacote do projeto removido/renomeado
+        raise HTTPException(status_code=409, detail=str(e))
+    return fast_response(request, doc_results(run_findings(db, run.id)), adapter=DOC_RESULTS)
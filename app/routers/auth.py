@@ -1,6 +1,8 @@
 # app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from ..config import settings
 from ..db import SessionLocal
 from ..models import User
 from ..schemas import TokenRequest, TokenResponse
@@ -15,13 +17,22 @@ def get_db():
     finally:
         db.close()
 
-def seed_user():
+def seed_user() -> bool:
+    """Cria o admin padrão uma única vez. A checagem vem antes do hash (PBKDF2 com
+    100k iterações) e é segura com vários workers subindo juntos."""
+    if not settings.seed_admin:
+        return False
     db = SessionLocal()
     try:
-        if not db.query(User).filter_by(email="admin@local").first():
-            u = User(email="admin@local", password_hash=hash_password("admin"))
-            db.add(u)
+        if db.query(User.id).filter_by(email="admin@local").first():
+            return False
+        db.add(User(email="admin@local", password_hash=hash_password("admin")))
+        try:
             db.commit()
+        except IntegrityError:
+            db.rollback()  # outro worker criou ao mesmo tempo
+            return False
+        return True
     finally:
         db.close()
 
@@ -1,25 +1,20 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
-from ..models import Document, Project
+from ..db import SessionLocal, get_read_db
+from ..models import Document, Project, PROJECT_DELETING
 from ..schemas import (
     DocumentIn,
     DocumentOut,
     DocumentDetailOut,
     DocumentUpdateIn,
 )
-
-# ---- opcional: parsers p/ upload ----
-try:
-    from pypdf import PdfReader
-except Exception:
-    PdfReader = None
-
-try:
-    import docx  # python-docx
-except Exception:
-    docx = None
+from ..services.content import content_totals, detail_payload, replace_page
+from ..services import stats
+from ..services.purge import delete_documents
+from ..services.extraction import extract_pages, strip_pages, MissingDependency
+from ..utils.serialization import DOCUMENTS, fast_response
+from ..utils.http_cache import make_etag, not_modified, cache_headers
 
 router = APIRouter()
 
@@ -36,37 +31,32 @@ def get_db():
 # =============================
 # Helpers (para upload opcional)
 # =============================
-def _extract_text_from_bytes(filename: str, data: bytes) -> str:
-    name = (filename or "").lower()
-    if name.endswith(".txt"):
-        try:
-            return data.decode("utf-8", errors="ignore")
-        except Exception:
-            return ""
-    if name.endswith(".pdf"):
-        if not PdfReader:
-            raise HTTPException(status_code=500, detail="Dependência ausente: pypdf")
-        import io
-        reader = PdfReader(io.BytesIO(data))
-        pages = []
-        for pg in reader.pages:
-            try:
-                pages.append(pg.extract_text() or "")
-            except Exception:
-                pages.append("")
-        return "\n".join(pages)
-    if name.endswith(".docx"):
-        if not docx:
-            raise HTTPException(status_code=500, detail="Dependência ausente: python-docx")
-        import io
-        d = docx.Document(io.BytesIO(data))
-        return "\n".join(p.text for p in d.paragraphs)
-
-    # fallback: tenta como texto puro
+def _extract_pages_from_bytes(filename: str, data: bytes) -> List[str]:
     try:
-        return data.decode("utf-8", errors="ignore")
-    except Exception:
-        return ""
+        return extract_pages(filename, data)
+    except MissingDependency as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _extract_text_from_bytes(filename: str, data: bytes) -> str:
+    return "".join(_extract_pages_from_bytes(filename, data))
+
+# Projeto em exclusão (tombstone) não aceita leitura nem escrita: edições
+# disputariam com os lotes do purge. Nas escritas a linha do projeto fica com
+# FOR SHARE até o commit, então mark_deleting espera as escritas em andamento.
+_ACTIVE = Project.status.is_distinct_from(PROJECT_DELETING)
+
+def _check_project(db: Session, project_id: int, lock: bool = False) -> None:
+    q = db.query(Project.id).filter(Project.id == project_id, _ACTIVE)
+    if lock:
+        q = q.with_for_update(read=True)
+    if not q.first():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+def _active_document(db: Session, doc_id: int, lock: bool = False) -> Optional[Document]:
+    q = db.query(Document).join(Project, Project.id == Document.project_id).filter(Document.id == doc_id, _ACTIVE)
+    if lock:
+        q = q.with_for_update(read=True, of=Project)
+    return q.first()
 
 # =============================
 # Rotas
@@ -74,43 +64,98 @@ def _extract_text_from_bytes(filename: str, data: bytes) -> str:
 
 @router.post("", response_model=DocumentOut)
 def create_document(payload: DocumentIn, db: Session = Depends(get_db)):
-    if not db.query(Project).filter_by(id=payload.project_id).first():
-        raise HTTPException(status_code=404, detail="Project not found")
+    _check_project(db, payload.project_id, lock=True)
     d = Document(project_id=payload.project_id, title=payload.title, content=payload.content)
+    d.refresh_features(payload.content)
     db.add(d)
+    db.flush()
+    stats.document_added(db, d.project_id, sum(c.raw_size for c in d.chunks))
     db.commit()
     db.refresh(d)
     return d
 
 @router.get("/{project_id}", response_model=List[DocumentOut])
-def list_documents(project_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(Document)
-        .filter_by(project_id=project_id)
-        .order_by(Document.id.desc())
-        .all()
-    )
+def list_documents(
+    project_id: int,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Tamanho da janela (sem limite: todos)"),
+    before_id: Optional[int] = Query(None, ge=1, description="Cursor: documentos com id menor que este"),
+    q: Optional[str] = Query(None, min_length=1, max_length=200, description="Busca no título"),
+    db: Session = Depends(get_read_db),
+):
+    """Documentos do projeto, do mais novo para o mais antigo. Com `limit`/`before_id`
+    pagina por cursor (custo constante em qualquer página, pelo índice (project_id, id))."""
+    _check_project(db, project_id)
+    # contador do projeto (ProjectStats), avançado a cada criação, edição ou exclusão:
+    # uma leitura por chave, sem agregar os documentos
+    etag = make_etag("documents", project_id, stats.documents_version(db, project_id))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    query = db.query(Document).filter_by(project_id=project_id)
+    if q and q.strip():
+        pattern = "%" + q.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.filter(Document.title.ilike(pattern, escape="\\"))
+    if before_id is not None:
+        query = query.filter(Document.id < before_id)
+    query = query.order_by(Document.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return fast_response(request, query.all(), adapter=DOCUMENTS, headers=cache_headers(etag))
 
 @router.get("/detail/{doc_id}", response_model=DocumentDetailOut)
-def get_document(doc_id: int, db: Session = Depends(get_db)):
-    d = db.query(Document).filter_by(id=doc_id).first()
+def get_document(
+    doc_id: int,
+    request: Request,
+    response: Response,
+    page: Optional[int] = Query(None, ge=1, description="Página (1..total_pages)"),
+    offset: Optional[int] = Query(None, ge=0, description="Offset em caracteres"),
+    limit: Optional[int] = Query(None, ge=1, description="Máximo de caracteres a partir do offset"),
+    db: Session = Depends(get_read_db),
+):
+    d = _active_document(db, doc_id)
     if not d:
         raise HTTPException(status_code=404, detail="Document not found")
-    return d
+    # a versão vem da linha do documento; o conteúdo só é lido se o cliente não tem a cópia atual
+    etag = make_etag("document", d.id, d.revision or 1)
+    cached = not_modified(request, etag, d.updated_at)
+    if cached is not None:
+        return cached
+    response.headers.update(cache_headers(etag, d.updated_at))
+    return detail_payload(db, d, page=page, offset=offset, limit=limit)
 
 @router.put("/{doc_id}", response_model=DocumentDetailOut)
 def update_document(doc_id: int, payload: DocumentUpdateIn, db: Session = Depends(get_db)):
-    d = db.query(Document).filter_by(id=doc_id).first()
+    d = _active_document(db, doc_id, lock=True)
     if not d:
         raise HTTPException(status_code=404, detail="Document not found")
+    if payload.content is not None and payload.page is not None:
+        # só dá para substituir uma página existente ou acrescentar a seguinte
+        _, total_pages = content_totals(db, d.id)
+        if payload.page > total_pages + 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Página {payload.page} fora do documento ({total_pages} páginas)",
+            )
+    d.touch()
+    before = stats.document_bytes(db, d.id)
     if payload.title is not None:
         d.title = payload.title
     if payload.content is not None:
-        d.content = payload.content
+        if payload.page is not None:
+            replace_page(db, d, payload.page, payload.content)
+            db.flush()
+            d.refresh_features()
+        else:
+            d.content = payload.content
+            d.refresh_features(payload.content)
     db.add(d)
+    db.flush()
+    stats.document_changed(db, d.project_id, stats.document_bytes(db, d.id) - before)
     db.commit()
     db.refresh(d)
-    return d
+    return detail_payload(db, d, page=payload.page)
 
 # (Opcional) Upload direto na API — só use se o front for enviar multipart para /documents/upload
 @router.post("/upload", response_model=DocumentOut)
@@ -119,19 +164,22 @@ def upload_document(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
-    if not db.query(Project).filter_by(id=project_id).first():
-        raise HTTPException(status_code=404, detail="Project not found")
+    _check_project(db, project_id, lock=True)
 
     raw = file.file.read()
     if not raw:
         raise HTTPException(status_code=400, detail="Arquivo vazio")
 
-    content = _extract_text_from_bytes(file.filename, raw).strip()
-    if not content:
+    pages = strip_pages(_extract_pages_from_bytes(file.filename, raw))
+    if not pages:
         raise HTTPException(status_code=400, detail="Não foi possível extrair texto do arquivo")
 
-    d = Document(project_id=project_id, title=file.filename, content=content)
+    d = Document(project_id=project_id, title=file.filename)
+    d.set_pages(pages)
+    d.refresh_features("".join(pages))
     db.add(d)
+    db.flush()
+    stats.document_added(db, d.project_id, sum(c.raw_size for c in d.chunks))
     db.commit()
     db.refresh(d)
     return d
@@ -139,9 +187,11 @@ def upload_document(
 
 @router.delete("/{document_id}")
 def delete_document(document_id: int, db: Session = Depends(get_db)):
-    doc = db.query(Document).filter(Document.id == document_id).first()
+    doc = _active_document(db, document_id, lock=True)
     if not doc:
         raise HTTPException(status_code=404, detail="Documento não encontrado")
-    db.delete(doc)
+    project_id, nbytes = doc.project_id, stats.document_bytes(db, doc.id)
+    delete_documents(db, [doc.id], project_id)
+    stats.document_removed(db, project_id, nbytes)
     db.commit()
     return {"message": f"Documento {document_id} deletado com sucesso"}
@@ -1,9 +1,15 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
-from ..models import Project
-from ..schemas import ProjectIn, ProjectOut
+from ..db import SessionLocal, get_read_db
+from ..models import Project, ProjectStats, PROJECT_DELETING
+from ..schemas import ProjectIn, ProjectOut, ProjectUpdateIn, ProjectStatsOut
+from ..services.rules import get_pack, RulePackError
+from ..services.purge import mark_deleting, purge_project
+from ..services.stats import project_stats, stats_version
+from ..utils.serialization import PROJECTS, fast_response
+from ..utils.http_cache import make_etag, not_modified, cache_headers
 from typing import List
 
 router = APIRouter()
@@ -15,23 +21,83 @@ def get_db():
     finally:
         db.close()
 
+def _check_rule_pack(name):
+    if name is None:
+        return
+    try:
+        get_pack(name)
+    except RulePackError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("", response_model=ProjectOut)
 def create_project(payload: ProjectIn, db: Session = Depends(get_db)):
-    p = Project(name=payload.name, description=payload.description)
+    _check_rule_pack(payload.rule_pack)
+    p = Project(name=payload.name, description=payload.description, rule_pack=payload.rule_pack)
     db.add(p)
+    db.flush()
+    db.add(ProjectStats(project_id=p.id, document_count=0, total_bytes=0))
     db.commit()
     db.refresh(p)
     return p
 
 @router.get("", response_model=List[ProjectOut])
-def list_projects(db: Session = Depends(get_db)):
-    return db.query(Project).order_by(Project.id.desc()).all()
+def list_projects(request: Request, db: Session = Depends(get_read_db)):
+    active = Project.status.is_distinct_from(PROJECT_DELETING)
+    # versão da lista: muda com inclusão, exclusão ou edição de qualquer projeto
+    version = db.query(
+        func.count(Project.id), func.max(Project.id), func.sum(func.coalesce(Project.revision, 1))
+    ).filter(active).one()
+    etag = make_etag("projects", *version)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    projects = db.query(Project).filter(active).order_by(Project.id.desc()).all()
+    return fast_response(request, projects, adapter=PROJECTS, headers=cache_headers(etag))
+
+@router.get("/stats", response_model=List[ProjectStatsOut])
+def list_project_stats(request: Request, db: Session = Depends(get_read_db)):
+    """Painel: estatísticas de todos os projetos em uma consulta."""
+    etag = make_etag("project-stats", *stats_version(db))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return fast_response(request, project_stats(db), headers=cache_headers(etag))
 
-@router.delete("/{project_id}")
-def delete_project(project_id: int, db: Session = Depends(get_db)):
+@router.get("/{project_id}/stats", response_model=ProjectStatsOut)
+def get_project_stats(project_id: int, db: Session = Depends(get_read_db)):
+    rows = project_stats(db, [project_id])
+    if not rows:
+        raise HTTPException(status_code=404, detail="Projeto não encontrado")
+    return rows[0]
+
+@router.put("/{project_id}", response_model=ProjectOut)
+def update_project(project_id: int, payload: ProjectUpdateIn, db: Session = Depends(get_db)):
+    p = db.query(Project).filter_by(id=project_id).first()
+    if not p:
+        raise HTTPException(status_code=404, detail="Projeto não encontrado")
+    p.touch()
+    if payload.name is not None:
+        p.name = payload.name
+    if payload.description is not None:
+        p.description = payload.description
+    if payload.rule_pack is not None:
+        _check_rule_pack(payload.rule_pack)
+        p.rule_pack = payload.rule_pack
+    db.add(p)
+    db.commit()
+    db.refresh(p)
+    return p
+
+@router.delete("/{project_id}", status_code=202)
+def delete_project(project_id: int, background: BackgroundTasks, db: Session = Depends(get_db)):
+    """Marca o projeto como em exclusão e apaga os dados em lotes, em segundo plano.
+    Repetir o DELETE retoma uma exclusão que falhou; se ela ainda estiver
+    rodando, o purge_lock faz a nova tentativa sair sem fazer nada."""
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Projeto não encontrado")
-    db.delete(project)
-    db.commit()
-    return {"message": f"Projeto {project_id} deletado com sucesso"}
+    if project.status != PROJECT_DELETING:
+        mark_deleting(db, project)
+    background.add_task(purge_project, project_id)
+    return {"message": f"Projeto {project_id} em exclusão", "status": PROJECT_DELETING}
@@ -1,42 +1,194 @@
 # backend/app/routers/reports.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 
-from ..db import get_db
-from ..models import Project, Document
-from ..schemas import AnalysisDocResult
-from app.services.analyses import analyze_document
+from ..db import get_db, get_read_db, wrote_recently
+from ..models import Project, Document, Analysis, AnalysisFinding, PROJECT_DELETING
+from ..schemas import AnalysisDocResult, AnalysisRunOut, EvidenceOut
+from ..services.content import read_range
+from ..services.analyses import document_spans
+from ..services.findings import Findings, context_snippet, page_spans
+from ..services.rules import RulePack, RulePackError
+from ..services.runs import (
+    latest_run,
+    run_findings,
+    run_project_analysis,
+    doc_results,
+    project_pack,
+    is_stale,
+    doc_payload,
+)
+from ..services.export import EXPORT_FORMATS, export_stream
+from ..services.stats import documents_version
+from ..utils.serialization import ANALYSIS_RUNS, DOC_RESULTS, fast_response
+from ..utils.http_cache import make_etag, not_modified, cache_headers
+from ..utils.normalize import normalize_text
 
-router = APIRouter(prefix="/reports", tags=["reports"])
+# prefixo "/reports" é aplicado em main.py
+router = APIRouter(tags=["reports"])
 
-@router.get("/{project_id}", response_model=List[AnalysisDocResult])
-def get_report(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(Project).filter_by(id=project_id).first()
+def _get_project(db: Session, project_id: int) -> Project:
+    project = db.query(Project).filter(Project.id == project_id, Project.status.is_distinct_from(PROJECT_DELETING)).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+def _project_pack(db: Session, project_id: int) -> RulePack:
+    """Pacote de regras do projeto; 409 se ele não existe mais (removido ou
+    renomeado depois de escolhido): o projeto precisa de outro pacote."""
+    try:
+        return project_pack(db, project_id)
+    except RulePackError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+def _run_response(request: Request, db: Session, run: Analysis):
+    return fast_response(
+        request,
+        doc_results(run_findings(db, run.id)),
+        adapter=DOC_RESULTS,
+        headers=cache_headers(make_etag("run", run.id), run.finished_at),
+    )
+
+@router.get("/{project_id}", response_model=List[AnalysisDocResult])
+def get_report(
+    project_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_db),
+):
+    """Relatório do último run persistido; só analisa se o projeto nunca foi analisado
+    ou se as regras ou os documentos do projeto mudaram desde o último run. A leitura
+    vai à réplica; o run novo (escrita) é gravado e lido no primário."""
+    _get_project(db, project_id)
+
+    pack = _project_pack(db, project_id)
+    run = latest_run(db, project_id)
+    if run is None or is_stale(run, pack, documents_version(db, project_id)):
+        if not db.query(Document.id).filter_by(project_id=project_id).first():
+            raise HTTPException(status_code=404, detail="No documents for this project")
+        db = primary
+        run = run_project_analysis(db, project_id)
+    else:
+        # runs são imutáveis: o id identifica o relatório
+        cached = not_modified(request, make_etag("run", run.id), run.finished_at)
+        if cached is not None:
+            return cached
 
-    docs = (
-        db.query(Document)
+    return _run_response(request, db, run)
+
+@router.get("/{project_id}/runs", response_model=List[AnalysisRunOut])
+def list_runs(project_id: int, request: Request, db: Session = Depends(get_read_db)):
+    """Histórico de runs (com agregados) para comparação."""
+    _get_project(db, project_id)
+    version = db.query(func.count(Analysis.id), func.max(Analysis.id)).filter_by(project_id=project_id).one()
+    etag = make_etag("runs", project_id, *version)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    runs = (
+        db.query(Analysis)
         .filter_by(project_id=project_id)
-        .order_by(Document.id.desc())
+        .order_by(Analysis.id.desc())
         .all()
     )
-    if not docs:
-        raise HTTPException(status_code=404, detail="No documents for this project")
-
-    results: List[AnalysisDocResult] = []
-    for d in docs:
-        result = analyze_document({
-            "id": d.id,
-            "title": d.title,
-            "content": d.content,
-            "created_at": d.created_at,
-        })
-        results.append({
-            "document_id": d.id,
-            "title": d.title,
-            "created_at": d.created_at,  # pydantic converte automaticamente para ISO 8601
-            "result": result
-        })
-    return results
+    return fast_response(request, runs, adapter=ANALYSIS_RUNS, headers=cache_headers(etag))
+
+@router.get("/{project_id}/runs/{analysis_id}", response_model=List[AnalysisDocResult])
+def get_run_report(project_id: int, analysis_id: int, request: Request, db: Session = Depends(get_read_db)):
+    _get_project(db, project_id)
+    run = db.query(Analysis).filter_by(id=analysis_id, project_id=project_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    cached = not_modified(request, make_etag("run", run.id), run.finished_at)
+    if cached is not None:
+        return cached
+    return _run_response(request, db, run)
+
+@router.get("/{project_id}/documents/{document_id}/evidence", response_model=List[EvidenceOut])
+def get_evidence(
+    project_id: int,
+    document_id: int,
+    request: Request,
+    response: Response,
+    tipo: Optional[str] = Query(None, description="cpf, email, kw:<bucket>..."),
+    window: int = Query(40, ge=0, le=500),
+    offset: int = Query(0, ge=0, description="Pula as primeiras ocorrências (paginação)"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+):
+    """Trechos de contexto dos achados do último run, lidos só das faixas necessárias.
+    O resultado guarda as primeiras ocorrências de cada tipo; páginas além delas
+    são recalculadas do texto. `X-Total-Count` traz o total de ocorrências."""
+    _get_project(db, project_id)
+    run = latest_run(db, project_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="No analysis for this project")
+    f = db.query(AnalysisFinding).filter_by(analysis_id=run.id, document_id=document_id).first()
+    if not f:
+        raise HTTPException(status_code=404, detail="Document not in latest analysis")
+    # offsets são da revisão analisada: depois de uma edição apontariam para outro texto
+    revision = db.query(Document.revision).filter_by(project_id=project_id, id=document_id).scalar() or 1
+    if f.document_revision is not None and f.document_revision != revision:
+        raise HTTPException(status_code=409, detail="Documento alterado depois da análise; rode a análise novamente")
+    etag = make_etag("evidence", run.id, document_id, revision)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers.update(cache_headers(etag))
+    compact = ((f.result or {}).get("achados") or {}).get("evidencias")
+    if not compact:
+        response.headers["X-Total-Count"] = "0"
+        return []
+
+    stored = Findings.from_compact(compact)
+    counts = compact.get("contagem") or stored.count_by_type()
+    spans = page_spans(stored, counts, tipo, offset, limit)
+    if spans is None:
+        pack = _project_pack(db, project_id)
+        if pack.stamp != run.rules_version:
+            raise HTTPException(status_code=409, detail="Regras mudaram desde a análise; gere o relatório novamente")
+        d = (
+            db.query(Document)
+            .options(selectinload(Document.chunks), selectinload(Document.features))
+            .filter_by(project_id=project_id, id=document_id)
+            .first()
+        )
+        payload = doc_payload(d)
+        norm = payload.get("normalized") or normalize_text(payload["content"])
+        full = document_spans(payload["content"], norm, pack)
+        counts = full.count_by_type()
+        spans = page_spans(full, counts, tipo, offset, limit)
+    response.headers["X-Total-Count"] = str(counts.get(tipo, 0) if tipo is not None else sum(counts.values()))
+
+    out = []
+    for type_name, start, end in spans:
+        lo = max(start - window, 0)
+        text, base, _ = read_range(db, document_id, lo, end + window - lo)
+        out.append(context_snippet(text, start, end, window, base=base) | {"tipo": type_name})
+    return out
+
+@router.get("/{project_id}/export")
+def export_report(
+    project_id: int,
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|jsonl|xlsx)$"),
+    gzip: bool = Query(False, description="Comprime a saída com gzip"),
+    source: str = Query("latest", pattern="^(latest|live)$", description="latest: último run; live: analisa agora"),
+    db: Session = Depends(get_read_db),
+):
+    """Exporta o relatório em fluxo; linhas são lidas/analisadas sob demanda."""
+    _get_project(db, project_id)
+    _project_pack(db, project_id)  # erro antes de começar o fluxo, não no meio dele
+    media_type, ext = EXPORT_FORMATS[format]
+    filename = f"relatorio_projeto_{project_id}.{ext}"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        export_stream(project_id, format, source=source, gzip=gzip, primary=wrote_recently(request)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
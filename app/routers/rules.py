@@ -0,0 +1,19 @@
+# backend/app/routers/rules.py
+from typing import List
+from fastapi import APIRouter, HTTPException
+
+from ..schemas import RulePackOut
+from ..services.rules import registry, get_pack, pack_info, RulePackError
+
+router = APIRouter()
+
+@router.get("", response_model=List[RulePackOut])
+def list_rule_packs():
+    return [pack_info(p) for p in registry.all()]
+
+@router.get("/{name}", response_model=RulePackOut)
+def get_rule_pack(name: str):
+    try:
+        return pack_info(get_pack(name))
+    except RulePackError as e:
+        raise HTTPException(status_code=404, detail=str(e))
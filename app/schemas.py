@@ -17,15 +17,32 @@ class TokenResponse(BaseModel):
 class ProjectIn(BaseModel):
     name: str = Field(..., min_length=2)
     description: Optional[str] = None
+    rule_pack: Optional[str] = None
+
+class ProjectUpdateIn(BaseModel):
+    name: Optional[str] = Field(default=None, min_length=2)
+    description: Optional[str] = None
+    rule_pack: Optional[str] = None
 
 class ProjectOut(BaseModel):
     id: int
     name: str
     description: Optional[str]
+    rule_pack: Optional[str] = None
 
     class Config:
         from_attributes = True  
 
+class ProjectStatsOut(BaseModel):
+    project_id: int
+    name: str
+    description: Optional[str] = None
+    document_count: int = 0
+    total_bytes: int = 0
+    pii_totals: Dict[str, int] = {}
+    severity_histogram: Dict[str, int] = {}
+    last_analysis_at: Optional[datetime] = None
+
 # ---------- Documents ----------
 class DocumentIn(BaseModel):
     project_id: int
@@ -41,14 +58,27 @@ class DocumentOut(BaseModel):
     class Config:
         from_attributes = True
 
-# Detalhe (inclui conteúdo)
+# Detalhe (inclui conteúdo — completo ou a janela pedida por página/offset)
 class DocumentDetailOut(DocumentOut):
     content: str
+    page: Optional[int] = None
+    range_start: int = 0
+    range_end: int = 0
+    total_chars: int = 0
+    total_pages: int = 0
 
-# Atualização parcial
+# Atualização parcial (com `page`, `content` substitui só aquela página)
 class DocumentUpdateIn(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
+    page: Optional[int] = Field(default=None, ge=1)
+
+# ---------- Rules ----------
+class RulePackOut(BaseModel):
+    name: str
+    version: str
+    description: str = ""
+    buckets: List[str] = []
 
 # ---------- Analyses ----------
 class AnalysisRunIn(BaseModel):
@@ -61,3 +91,25 @@ class AnalysisDocResult(BaseModel):
     created_at: Optional[datetime] = None
     result: Dict[str, Any]
 
+class EvidenceOut(BaseModel):
+    tipo: str
+    inicio: int
+    fim: int
+    antes: str
+    trecho: str
+    depois: str
+
+class AnalysisRunOut(BaseModel):
+    id: int
+    project_id: int
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    status: str
+    summary: Optional[str] = None
+    document_count: int = 0
+    rollup: Optional[Dict[str, Any]] = None
+    rules_version: Optional[str] = None
+    full_project: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
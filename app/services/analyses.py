@@ -1,56 +1,54 @@
 # backend/app/services/analysis.py
 import os, re
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 
+from .rules import RulePack, get_pack
+from .findings import Findings
+from ..utils.normalize import NormalizedText, normalize_text
+from ..utils.tracing import span
+
 # --------- Regras locais (PII Brasil + LGPD) ---------
 CPF_RE   = re.compile(r"\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b")
 CNPJ_RE  = re.compile(r"\b\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b")
 EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 TEL_RE   = re.compile(r"\b(?:\+?55\s?)?(?:\(?\d{2}\)?\s?)?\d{4,5}-?\d{4}\b")
 
-KEYWORDS = {
-    "lgpd_base_legal": ["base legal", "consentimento", "legítimo interesse", "contrato", "obrigação legal"],
-    "lgpd_direitos": ["titular", "direito de acesso", "correção", "eliminação", "portabilidade"],
-    "lgpd_governanca": ["dpo", "encarregado", "privacy by design", "privacy by default", "matriz de risco"],
-    "lgpd_segurança": ["criptografia", "pseudonimização", "anonimização", "controle de acesso", "backup", "retenção", "retencao", "logs"],
-    "revogacao_acesso": ["revogação de acesso", "desligamento", "offboarding", "acesso indevido", "segregação de funções", "sox"],
-    "incidente": ["incidente de segurança", "vazamento", "notificação anpd", "breach"],
-}
+# Palavras-chave, pesos e recomendações vêm dos pacotes de regras (app/rules/*.json)
 
-SEVERITY_WEIGHT = {
-    "PII": 3,
-    "revogacao_acesso": 3,
-    "lgpd_segurança": 2,
-    "lgpd_base_legal": 2,
-    "lgpd_direitos": 2,
-    "lgpd_governanca": 1,
-    "incidente": 3,
+PII_PATTERNS = {
+    "cpf": CPF_RE,
+    "cnpj": CNPJ_RE,
+    "email": EMAIL_RE,
+    "telefone": TEL_RE,
 }
 
+# Spans guardados no resultado por tipo (PII ou bucket de palavra-chave); as
+# contagens continuam exatas e o restante é paginado pelo endpoint de evidências
+MAX_EVIDENCE_PER_TYPE = 20
+
 def detect_pii(text: str) -> Dict[str, List[str]]:
-    return {
-        "cpf": CPF_RE.findall(text or ""),
-        "cnpj": CNPJ_RE.findall(text or ""),
-        "email": EMAIL_RE.findall(text or ""),
-        "telefone": TEL_RE.findall(text or ""),
-    }
+    return {name: rx.findall(text or "") for name, rx in PII_PATTERNS.items()}
 
-def keyword_hits(text: str) -> Dict[str, List[str]]:
-    t = (text or "").lower()
-    hits = {}
-    for bucket, words in KEYWORDS.items():
-        found = [w for w in words if w in t]
-        if found:
-            hits[bucket] = found
-    return hits
-
-def severity_from_hits(hits: Dict[str, List[str]], pii: Dict[str, List[str]]) -> str:
-    score = 0
-    if any(pii.values()):
-        score += SEVERITY_WEIGHT["PII"]
-    for bucket in hits.keys():
-        score += SEVERITY_WEIGHT.get(bucket, 1)
-    return "alto" if score >= 5 else "médio" if score >= 3 else "baixo"
+def detect_pii_spans(text: str, findings: Findings) -> Findings:
+    for name, rx in PII_PATTERNS.items():
+        for m in rx.finditer(text or ""):
+            findings.add(name, m.start(), m.end())
+    return findings
+
+def document_spans(content: str, norm: NormalizedText, pack: RulePack) -> Findings:
+    """Todos os spans do documento, na mesma ordem de analyze_document."""
+    findings = detect_pii_spans(content, Findings(content, tuple(PII_PATTERNS)))
+    pack.keyword_spans(norm, findings)
+    return findings
+
+def keyword_hits(text: str, pack: Optional[RulePack] = None) -> Dict[str, List[str]]:
+    pack = pack or get_pack()
+    return pack.keyword_hits(normalize_text(text).text)
+
+def severity_from_hits(hits: Dict[str, List[str]], pii: Dict[str, List[str]], pack: Optional[RulePack] = None) -> str:
+    pack = pack or get_pack()
+    return pack.severity(hits, any(pii.values()))
 
 def summarize_local(text: str) -> str:
     lines = [ln.strip() for ln in (text or "").splitlines() if ln.strip()]
@@ -60,12 +58,17 @@ def summarize_local(text: str) -> str:
 def _llm_enabled() -> bool:
     return bool(os.getenv("OPENAI_API_KEY"))
 
+@lru_cache(maxsize=4)
+def _openai_client(api_key: str):
+    # SDK importado só quando o LLM está habilitado; cliente reaproveitado entre chamadas
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
 def refine_with_llm(title: str, text: str, prelim: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     if not _llm_enabled():
         return None
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = _openai_client(os.getenv("OPENAI_API_KEY"))
         prompt = f"""
 Você é um auditor de conformidade LGPD. Com base no documento abaixo, valide e refine os achados.
 Título: {title}
@@ -78,11 +81,13 @@ Achados preliminares (JSON):
 
 Responda em JSON com as chaves: resumo, achados, severidade, recomendacoes (máx 5).
 """
-        resp = client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-        )
+        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        with span("llm.chat", **{"llm.model": model, "llm.prompt_chars": len(prompt)}):
+            resp = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+            )
         import json
         content = resp.choices[0].message.content
         return json.loads(content)
@@ -90,25 +95,39 @@ Responda em JSON com as chaves: resumo, achados, severidade, recomendacoes (máx
         # Em caso de erro (timeout/limite/conexão), mantém o resultado local
         return None
 
-def analyze_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_document(doc: Dict[str, Any], use_llm: bool = True, pack: Optional[RulePack] = None) -> Dict[str, Any]:
+    pack = pack or get_pack()
     title = doc.get("title", f"doc-{doc.get('id')}")
     content = doc.get("content", "")
-    pii = detect_pii(content)
-    hits = keyword_hits(content)
-    severity = severity_from_hits(hits, pii)
+    # forma normalizada pré-calculada na ingestão; calcula aqui só se faltar
+    norm: Optional[NormalizedText] = doc.get("normalized")
+    if norm is None:
+        with span("analyze.normalize", chars=len(content)):
+            norm = normalize_text(content)
+    # spans em vez de listas de strings: só as 5 amostras de PII viram texto
+    with span("analyze.pii", chars=len(content)):
+        findings = detect_pii_spans(content, Findings(content, tuple(PII_PATTERNS)))
+    with span("analyze.keywords", pack=pack.stamp):
+        hits = pack.keyword_spans(norm, findings)
+    with span("analyze.severity"):
+        counts = findings.count_by_type()
+        pii_counts = {k: counts[k] for k in PII_PATTERNS if counts.get(k)}
+        severity = pack.severity(hits, bool(pii_counts))
     prelim = {
         "resumo": summarize_local(content),
         "achados": {
-            "pii": {k: v[:5] for k, v in pii.items() if v},
+            "pii": {k: findings.texts(k, limit=5) for k in pii_counts},
+            "pii_contagem": pii_counts,
             "palavras_chave": hits,
+            "evidencias": findings.to_compact(MAX_EVIDENCE_PER_TYPE),
         },
         "severidade": severity,
-        "recomendacoes": [
-            "Definir base legal e registrar evidências de consentimento quando aplicável.",
-            "Endereçar processo de revogação de acessos no desligamento (offboarding).",
-            "Estabelecer política de retenção e descarte de dados.",
-            "Aplicar controles de segurança: criptografia, logs e segregação de funções.",
-        ],
+        "recomendacoes": list(pack.recommendations),
+        "regras": pack.stamp,
     }
+    if not use_llm:
+        return prelim
     refined = refine_with_llm(title, content, prelim)
+    if isinstance(refined, dict):
+        refined.setdefault("regras", pack.stamp)
     return refined or prelim
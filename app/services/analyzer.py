@@ -5,19 +5,22 @@
 # - Similaridade / regras heurísticas
 # - Geração de sumário com evidências
 
-from typing import Iterable
+from typing import Iterable, Optional
 from dataclasses import dataclass
 
+from .rules import RulePack, get_pack
+from ..utils.normalize import normalize_text
+
 @dataclass
 class Finding:
     requirement: str
     status: str  # e.g., "OK", "GAP", "PARTIAL"
     evidence: str
 
-def run_analysis(texts: Iterable[str]) -> str:
-    # Exemplo bobo: marca como "GAP" se não encontrar palavras-chave
-    required = ["transparência", "governança", "dados pessoais", "rastreamento", "segurança"]
-    all_text = "\n".join(texts).lower()
+def run_analysis(texts: Iterable[str], pack: Optional[RulePack] = None) -> str:
+    # Exemplo bobo: marca como "GAP" se não encontrar os termos exigidos pelo pacote
+    required = (pack or get_pack()).required
+    all_text = normalize_text("\n".join(texts)).text
 
     findings = []
     for req in required:
@@ -0,0 +1,100 @@
+# backend/app/services/content.py
+# Leitura/edição do corpo de documentos por página ou faixa de caracteres,
+# descomprimindo apenas os blocos que cobrem a janela pedida.
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Document, DocumentContent
+from ..utils.pagination import chunk_pages
+
+def content_totals(db: Session, doc_id: int) -> Tuple[int, int]:
+    """(total de caracteres, total de páginas) sem carregar os blocos."""
+    chars, pages = (
+        db.query(func.coalesce(func.sum(DocumentContent.char_len), 0), func.coalesce(func.max(DocumentContent.page), 0))
+        .filter(DocumentContent.document_id == doc_id)
+        .one()
+    )
+    return int(chars), int(pages)
+
+def _chunks_query(db: Session, doc_id: int):
+    return (
+        db.query(DocumentContent)
+        .filter(DocumentContent.document_id == doc_id)
+        .order_by(DocumentContent.page, DocumentContent.part)
+    )
+
+def read_page(db: Session, doc_id: int, page: int) -> Tuple[str, int, int]:
+    """Texto da página e sua faixa [início, fim) no documento."""
+    chunks = _chunks_query(db, doc_id).filter(DocumentContent.page == page).all()
+    if not chunks:
+        return "", 0, 0
+    text = "".join(c.text for c in chunks)
+    start = chunks[0].char_start
+    return text, start, start + len(text)
+
+def read_range(db: Session, doc_id: int, offset: int, limit: Optional[int]) -> Tuple[str, int, int]:
+    """Texto em [offset, offset+limit) e a faixa efetivamente devolvida."""
+    q = _chunks_query(db, doc_id).filter(DocumentContent.char_start + DocumentContent.char_len > offset)
+    if limit is not None:
+        q = q.filter(DocumentContent.char_start < offset + limit)
+    chunks = q.all()
+    if not chunks:
+        return "", offset, offset
+    text = "".join(c.text for c in chunks)
+    base = chunks[0].char_start
+    lo = max(offset - base, 0)
+    hi = len(text) if limit is None else min(lo + limit, len(text))
+    return text[lo:hi], base + lo, base + hi
+
+def replace_page(db: Session, doc: Document, page: int, text: str) -> None:
+    """Substitui o texto de uma página e desloca os offsets das páginas seguintes."""
+    old = _chunks_query(db, doc.id).filter(DocumentContent.page == page).all()
+    if old:
+        start = old[0].char_start
+        old_len = sum(c.char_len for c in old)
+    else:
+        start, _ = content_totals(db, doc.id)
+        old_len = 0
+    for c in old:
+        db.delete(c)
+    db.flush()
+
+    delta = len(text) - old_len
+    if delta:
+        db.query(DocumentContent).filter(
+            DocumentContent.document_id == doc.id, DocumentContent.page > page
+        ).update({DocumentContent.char_start: DocumentContent.char_start + delta}, synchronize_session=False)
+
+    for _, part, rel_start, part_text in chunk_pages([text], settings.document_chunk_chars):
+        db.add(DocumentContent(document_id=doc.id, page=page, part=part, char_start=start + rel_start, text=part_text))
+    db.expire(doc, ["chunks"])
+
+def detail_payload(
+    db: Session,
+    doc: Document,
+    page: Optional[int] = None,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    total_chars, total_pages = content_totals(db, doc.id)
+    if page is not None:
+        text, start, end = read_page(db, doc.id, page)
+    elif offset is not None or limit is not None:
+        text, start, end = read_range(db, doc.id, offset or 0, limit)
+    else:
+        text = doc.content
+        start, end = 0, len(text)
+    return {
+        "id": doc.id,
+        "project_id": doc.project_id,
+        "title": doc.title,
+        "created_at": doc.created_at,
+        "content": text,
+        "page": page,
+        "range_start": start,
+        "range_end": end,
+        "total_chars": total_chars,
+        "total_pages": total_pages,
+    }
@@ -0,0 +1,222 @@
+# backend/app/services/export.py
+# Exportação do relatório em fluxo (CSV, JSONL, XLSX), linha a linha:
+# a memória usada não depende do número de documentos.
+import csv
+import io
+import json
+import re
+import zipfile
+import zlib
+from datetime import datetime
+from typing import Iterator, Iterable, Dict, Any, List
+from xml.sax.saxutils import escape
+
+from sqlalchemy.orm import selectinload
+
+from ..db import read_session
+from ..models import AnalysisFinding, Document
+from .analyses import analyze_document
+from .runs import latest_run, finding_from_result, project_pack, doc_payload, is_stale
+from .stats import documents_version
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+PII_TYPES = ("cpf", "cnpj", "email", "telefone")
+COLUMNS = (
+    ["document_id", "titulo", "criado_em", "severidade"]
+    + [f"pii_{t}" for t in PII_TYPES]
+    + ["palavras_chave", "recomendacoes"]
+)
+
+_BATCH_SIZE = 500
+_FLUSH_BYTES = 64 * 1024
+
+# ---------------- origem das linhas ----------------
+
+def _record(f: AnalysisFinding) -> Dict[str, Any]:
+    return {
+        "document_id": f.document_id,
+        "title": f.title,
+        "created_at": f.document_created_at,
+        "severity": f.severity,
+        "pii_counts": f.pii_counts or {},
+        "keyword_buckets": f.keyword_buckets or {},
+        "recommendations": f.recommendations or [],
+        "result": f.result,
+    }
+
+def iter_report_records(project_id: int, source: str = "latest", primary: bool = False) -> Iterator[Dict[str, Any]]:
+    """Achados do último run (lidos em lotes) ou, com source="live"/sem run atual,
+    analisados na hora documento a documento. Abre a própria sessão (réplica,
+    se houver) porque é consumido depois que a rota já retornou."""
+    db = read_session(primary=primary)
+    try:
+        pack = project_pack(db, project_id)
+        run = latest_run(db, project_id) if source == "latest" else None
+        if run is not None and not is_stale(run, pack, documents_version(db, project_id)):
+            q = (
+                db.query(AnalysisFinding)
+                .filter_by(analysis_id=run.id)
+                .order_by(AnalysisFinding.id)
+                .yield_per(_BATCH_SIZE)
+            )
+            for f in q:
+                yield _record(f)
+            return
+
+        q = (
+            db.query(Document)
+            .options(selectinload(Document.chunks), selectinload(Document.features))
+            .filter_by(project_id=project_id)
+            .order_by(Document.id.desc())
+            .yield_per(_BATCH_SIZE)
+        )
+        for d in q:
+            result = analyze_document(doc_payload(d), pack=pack)
+            yield _record(finding_from_result(d, result))
+    finally:
+        db.close()
+
+def _flat_row(rec: Dict[str, Any]) -> List[Any]:
+    created = rec["created_at"]
+    if isinstance(created, datetime):
+        created = created.isoformat()
+    pii = rec["pii_counts"]
+    return (
+        [rec["document_id"], rec["title"], created or "", rec["severity"]]
+        + [int(pii.get(t, 0)) for t in PII_TYPES]
+        + [
+            "; ".join(f"{b}: {', '.join(ws)}" for b, ws in rec["keyword_buckets"].items()),
+            " | ".join(rec["recommendations"]),
+        ]
+    )
+
+# ---------------- writers ----------------
+
+class _Buffer(io.RawIOBase):
+    """Destino só-escrita: acumula bytes até o gerador drená-los."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        b = bytes(b)
+        self._parts.append(b)
+        self.size += len(b)
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        self.size = 0
+        return data
+
+def csv_stream(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    out.write("\ufeff")  # BOM: Excel abre acentos corretamente
+    writer.writerow(COLUMNS)
+    for rec in records:
+        writer.writerow(_flat_row(rec))
+        if out.tell() >= _FLUSH_BYTES:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue().encode("utf-8")
+
+def jsonl_stream(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    buf: List[str] = []
+    size = 0
+    for rec in records:
+        line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= _FLUSH_BYTES:
+            yield "".join(buf).encode("utf-8")
+            buf.clear()
+            size = 0
+    yield "".join(buf).encode("utf-8")
+
+# XLSX mínimo (SpreadsheetML) escrito direto no zip, com strings inline:
+# dispensa shared strings e, portanto, não precisa manter nada em memória.
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XLSX_STATIC = {
+    "[Content_Types].xml": _XML_HEAD
+    + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>",
+    "_rels/.rels": _XML_HEAD
+    + f'<Relationships xmlns="{_NS_PKG_REL}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>",
+    "xl/workbook.xml": _XML_HEAD
+    + f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+    '<sheets><sheet name="Relatorio" sheetId="1" r:id="rId1"/></sheets></workbook>',
+    "xl/_rels/workbook.xml.rels": _XML_HEAD
+    + f'<Relationships xmlns="{_NS_PKG_REL}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+    "</Relationships>",
+}
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def _xlsx_cell(value: Any) -> str:
+    if isinstance(value, bool) or value is None:
+        value = "" if value is None else str(value)
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_INVALID.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _xlsx_row(values: Iterable[Any]) -> bytes:
+    return ("<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>").encode("utf-8")
+
+def xlsx_stream(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    sink = _Buffer()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, body in _XLSX_STATIC.items():
+            zf.writestr(name, body)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(f'{_XML_HEAD}<worksheet xmlns="{_NS_MAIN}"><sheetData>'.encode("utf-8"))
+            sheet.write(_xlsx_row(COLUMNS))
+            for rec in records:
+                sheet.write(_xlsx_row(_flat_row(rec)))
+                if sink.size >= _FLUSH_BYTES:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    comp = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> formato gzip
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if out:
+            yield out
+    yield comp.flush()
+
+_WRITERS = {"csv": csv_stream, "jsonl": jsonl_stream, "xlsx": xlsx_stream}
+
+def export_stream(
+    project_id: int,
+    fmt: str,
+    source: str = "latest",
+    gzip: bool = False,
+    primary: bool = False,
+) -> Iterator[bytes]:
+    stream = _WRITERS[fmt](iter_report_records(project_id, source, primary=primary))
+    return gzip_stream(stream) if gzip else stream
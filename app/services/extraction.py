@@ -0,0 +1,76 @@
+# backend/app/services/extraction.py
+# Extração de texto de arquivos enviados, preservando as páginas quando o formato tem.
+import importlib
+import io
+import os
+from typing import List
+
+from ..config import settings
+from ..utils.pagination import paginate_text, join_extracted_pages
+from ..utils.tracing import span
+
+# ---- opcional: parsers p/ upload ----
+# importados só no primeiro upload do formato: não pesam na subida da API
+_parsers = {}
+
+def _optional_import(module: str):
+    if module not in _parsers:
+        try:
+            _parsers[module] = importlib.import_module(module)
+        except Exception:
+            _parsers[module] = None
+    return _parsers[module]
+
+class MissingDependency(RuntimeError):
+    pass
+
+def _decode(data: bytes) -> str:
+    try:
+        return data.decode("utf-8", errors="ignore")
+    except Exception:
+        return ""
+
+def extract_pages(filename: str, data: bytes) -> List[str]:
+    """Páginas de texto do arquivo; "".join(páginas) é o texto completo."""
+    name = (filename or "").lower()
+    with span("extract", **{"file.ext": os.path.splitext(name)[1], "file.bytes": len(data)}):
+        return _extract_pages(name, data)
+
+def _extract_pages(name: str, data: bytes) -> List[str]:
+    if name.endswith(".pdf"):
+        pypdf = _optional_import("pypdf")
+        if not pypdf:
+            raise MissingDependency("Dependência ausente: pypdf")
+        reader = pypdf.PdfReader(io.BytesIO(data))
+        pages = []
+        for pg in reader.pages:
+            try:
+                pages.append(pg.extract_text() or "")
+            except Exception:
+                pages.append("")
+        return join_extracted_pages(pages)
+    if name.endswith(".docx"):
+        docx = _optional_import("docx")  # python-docx
+        if not docx:
+            raise MissingDependency("Dependência ausente: python-docx")
+        d = docx.Document(io.BytesIO(data))
+        return paginate_text("\n".join(p.text for p in d.paragraphs), settings.document_page_chars)
+
+    # .txt e fallback: tenta como texto puro
+    return paginate_text(_decode(data), settings.document_page_chars)
+
+def extract_text(filename: str, data: bytes) -> str:
+    return "".join(extract_pages(filename, data))
+
+def strip_pages(pages: List[str]) -> List[str]:
+    """Equivalente a .strip() no texto completo, mantendo a divisão em páginas."""
+    pages = list(pages)
+    while pages and not pages[0].strip():
+        pages.pop(0)
+    while pages and not pages[-1].strip():
+        pages.pop()
+    if not pages:
+        return []
+    pages[0] = pages[0].lstrip()
+    pages[-1] = pages[-1].rstrip()
+    return pages
@@ -0,0 +1,122 @@
+# backend/app/services/findings.py
+# Achados representados como spans (tipo, início, fim) em arrays compactos,
+# sem copiar trechos do texto. Strings e trechos de contexto só são
+# materializados quando alguém pede.
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+
+KEYWORD_PREFIX = "kw:"
+
+class Findings:
+    __slots__ = ("text", "types", "_type_ids", "kinds", "starts", "ends")
+
+    def __init__(self, text: Optional[str] = None, types: Tuple[str, ...] = ()):
+        self.text = text
+        self.types: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self.kinds = array("H")
+        self.starts = array("I")
+        self.ends = array("I")
+        for t in types:
+            self.type_id(t)
+
+    def type_id(self, name: str) -> int:
+        tid = self._type_ids.get(name)
+        if tid is None:
+            tid = self._type_ids[name] = len(self.types)
+            self.types.append(name)
+        return tid
+
+    def add(self, type_name: str, start: int, end: int) -> None:
+        self.kinds.append(self.type_id(type_name))
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def spans(self, type_name: Optional[str] = None) -> Iterator[Tuple[str, int, int]]:
+        want = self._type_ids.get(type_name) if type_name is not None else None
+        if type_name is not None and want is None:
+            return
+        for k, s, e in zip(self.kinds, self.starts, self.ends):
+            if want is None or k == want:
+                yield self.types[k], s, e
+
+    def count_by_type(self) -> Dict[str, int]:
+        counts = [0] * len(self.types)
+        for k in self.kinds:
+            counts[k] += 1
+        return {t: n for t, n in zip(self.types, counts) if n}
+
+    def texts(self, type_name: str, limit: Optional[int] = None) -> List[str]:
+        """Materializa as strings de um tipo (exige o texto de origem)."""
+        out = []
+        for _, s, e in self.spans(type_name):
+            out.append(self.text[s:e])
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+    def to_compact(self, limit_per_type: Optional[int] = None) -> Dict[str, Any]:
+        """{"tipos": [...], "spans": [tipo, início, fim, ...], "contagem": {tipo: n}}
+        Com `limit_per_type` guarda só as primeiras ocorrências de cada tipo;
+        "contagem" continua com o total."""
+        flat: List[int] = []
+        seen = [0] * len(self.types)
+        for k, s, e in zip(self.kinds, self.starts, self.ends):
+            if limit_per_type is not None:
+                if seen[k] >= limit_per_type:
+                    continue
+                seen[k] += 1
+            flat.extend((k, s, e))
+        return {"tipos": list(self.types), "spans": flat, "contagem": self.count_by_type()}
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, Any], text: Optional[str] = None) -> "Findings":
+        f = cls(text, tuple(data.get("tipos") or ()))
+        flat = data.get("spans") or []
+        f.kinds = array("H", flat[0::3])
+        f.starts = array("I", flat[1::3])
+        f.ends = array("I", flat[2::3])
+        return f
+
+def page_spans(
+    findings: Findings,
+    counts: Dict[str, int],
+    type_name: Optional[str],
+    offset: int,
+    limit: int,
+) -> Optional[List[Tuple[str, int, int]]]:
+    """Janela [offset, offset+limit) dos spans, agrupados por tipo na ordem de
+    `findings.types`. `counts` é o total real de cada tipo; se a janela passa do
+    que `findings` guarda de algum tipo, devolve None (precisa recalcular)."""
+    out: List[Tuple[str, int, int]] = []
+    pos = 0
+    for t in ([type_name] if type_name is not None else findings.types):
+        n = counts.get(t, 0)
+        if pos + n <= offset:
+            pos += n
+            continue
+        have = list(findings.spans(t))
+        lo, hi = max(offset - pos, 0), min(offset + limit - pos, n)
+        if hi > len(have):
+            return None
+        out.extend(have[lo:hi])
+        pos += n
+        if len(out) >= limit:
+            break
+    return out
+
+def context_snippet(text: str, start: int, end: int, window: int = 40, base: int = 0) -> Dict[str, Any]:
+    """Trecho com `window` caracteres de contexto de cada lado. `text` pode ser só
+    uma janela do documento começando no offset `base`."""
+    lo = max(start - base - window, 0)
+    hi = min(end - base + window, len(text))
+    return {
+        "inicio": start,
+        "fim": end,
+        "antes": text[lo:start - base],
+        "trecho": text[start - base:end - base],
+        "depois": text[end - base:hi],
+    }
@@ -0,0 +1,155 @@
+# backend/app/services/purge.py
+# Exclusão de projetos grandes em segundo plano: o projeto vira tombstone
+# ("deleting") na hora e os dados são apagados em lotes pequenos, cada um na
+# sua transação, para não travar tabelas nem estourar timeout.
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import delete, select, text, update
+
+from ..db import SessionLocal, engine
+from ..models import (
+    Project,
+    Document,
+    DocumentContent,
+    DocumentFeatures,
+    Analysis,
+    AnalysisFinding,
+    ProjectStats,
+    PROJECT_DELETING,
+)
+
+logger = logging.getLogger("app.purge")
+
+PURGE_BATCH_SIZE = 500
+# primeira chave do advisory lock (pg_try_advisory_lock(chave, project_id))
+_PURGE_LOCK_KEY = 0x70757267  # "purg"
+
+_running: set = set()
+_running_lock = threading.Lock()
+
+def _ids(db, stmt) -> List[int]:
+    return [row[0] for row in db.execute(stmt).all()]
+
+def delete_documents(db, doc_ids: List[int], project_id: Optional[int] = None) -> None:
+    """Apaga documentos e filhos explicitamente (em lote, sem depender do gatilho
+    por linha de `documents` particionada). Com `project_id` o DELETE em
+    documents lê só a partição do projeto."""
+    db.execute(
+        update(AnalysisFinding)
+        .where(AnalysisFinding.document_id.in_(doc_ids))
+        .values(document_id=None)
+    )
+    db.execute(delete(DocumentContent).where(DocumentContent.document_id.in_(doc_ids)))
+    db.execute(delete(DocumentFeatures).where(DocumentFeatures.document_id.in_(doc_ids)))
+    stmt = delete(Document).where(Document.id.in_(doc_ids))
+    if project_id is not None:
+        stmt = stmt.where(Document.project_id == project_id)
+    db.execute(stmt)
+
+def mark_deleting(db, project: Project) -> None:
+    project.status = PROJECT_DELETING
+    db.add(project)
+    db.commit()
+
+@contextmanager
+def purge_lock(project_id: int) -> Iterator[bool]:
+    """Só um purge por projeto: todo worker retoma as exclusões pendentes ao subir.
+    No PostgreSQL um advisory lock de sessão (em conexão própria, autocommit) vale
+    entre processos; o conjunto em memória cobre o mesmo processo e o SQLite."""
+    with _running_lock:
+        if project_id in _running:
+            yield False
+            return
+        _running.add(project_id)
+    try:
+        if engine.dialect.name != "postgresql":
+            yield True
+            return
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            args = {"k": _PURGE_LOCK_KEY, "id": project_id}
+            if not conn.execute(text("SELECT pg_try_advisory_lock(:k, :id)"), args).scalar():
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:k, :id)"), args)
+    finally:
+        with _running_lock:
+            _running.discard(project_id)
+
+def purge_project(project_id: int, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Apaga achados, runs, documentos (blocos e features) e por fim o projeto.
+    Idempotente: pode ser retomado após uma queda. Devolve documentos apagados
+    (0 se outro worker já está apagando o mesmo projeto)."""
+    with purge_lock(project_id) as acquired:
+        if not acquired:
+            logger.info("projeto %s já está sendo removido por outro worker", project_id)
+            return 0
+        return _purge(project_id, batch_size)
+
+def _purge(project_id: int, batch_size: int) -> int:
+    removed = 0
+    db = SessionLocal()
+    try:
+        # runs e achados
+        while True:
+            analysis_ids = _ids(db, select(Analysis.id).where(Analysis.project_id == project_id).limit(batch_size))
+            if not analysis_ids:
+                break
+            for aid in analysis_ids:
+                while True:
+                    finding_ids = _ids(
+                        db, select(AnalysisFinding.id).where(AnalysisFinding.analysis_id == aid).limit(batch_size)
+                    )
+                    if not finding_ids:
+                        break
+                    db.execute(delete(AnalysisFinding).where(AnalysisFinding.id.in_(finding_ids)))
+                    db.commit()
+            db.execute(delete(Analysis).where(Analysis.id.in_(analysis_ids)))
+            db.commit()
+
+        # documentos: filhos explicitamente (não depende do CASCADE existir no banco)
+        while True:
+            doc_ids = _ids(db, select(Document.id).where(Document.project_id == project_id).limit(batch_size))
+            if not doc_ids:
+                break
+            delete_documents(db, doc_ids, project_id)
+            db.commit()
+            removed += len(doc_ids)
+
+        db.execute(delete(ProjectStats).where(ProjectStats.project_id == project_id))
+        db.execute(delete(Project).where(Project.id == project_id))
+        db.commit()
+        logger.info("projeto %s removido (%s documentos)", project_id, removed)
+        return removed
+    except Exception:
+        db.rollback()
+        logger.exception("falha ao remover projeto %s; repita o DELETE ou será retomado no próximo start", project_id)
+        raise
+    finally:
+        db.close()
+
+def resume_pending_purges() -> threading.Thread:
+    """Retoma exclusões interrompidas (worker reiniciado no meio) sem segurar a subida.
+    Roda em todo worker; purge_lock garante um purge por projeto."""
+    def _run():
+        db = SessionLocal()
+        try:
+            pending = _ids(db, select(Project.id).where(Project.status == PROJECT_DELETING))
+        finally:
+            db.close()
+        for pid in pending:
+            try:
+                purge_project(pid)
+            except Exception as e:
+                # o traceback já foi registrado em _purge; segue para os demais
+                logger.warning("retomada da exclusão do projeto %s falhou (%s); próximo", pid, e)
+                continue
+
+    t = threading.Thread(target=_run, name="purge-resume", daemon=True)
+    t.start()
+    return t
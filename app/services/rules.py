@@ -0,0 +1,240 @@
+# backend/app/services/rules.py
+# Pacotes de regras (LGPD, SOX, personalizados por cliente) lidos de arquivos JSON.
+# Cada pacote é compilado uma vez em um RulePack imutável, versionado pelo hash do
+# conteúdo, e recarregado automaticamente quando o arquivo muda.
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Pattern, Tuple, Optional, Any
+
+from ..config import settings
+from .findings import Findings, KEYWORD_PREFIX
+from ..utils.normalize import NormalizedText, fold
+
+logger = logging.getLogger("app.rules")
+
+BUILTIN_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "rules")
+# entra na versão do pacote: mudar a forma de casar termos invalida os runs
+_MATCHER_VERSION = b"2"
+
+class RulePackError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class RulePack:
+    name: str
+    version: str
+    description: str
+    # (termo normalizado, bucket, grafia original) — busca por palavra inteira no
+    # texto normalizado; variantes com/sem acento colapsam em um único termo
+    terms: Tuple[Tuple[str, str, str], ...]
+    buckets: Tuple[str, ...]
+    weights: Dict[str, int] = field(hash=False)
+    # uma alternância com todos os termos; veja _compile_matcher
+    matcher: Pattern = field(hash=False, compare=False)
+    # termo casado -> (comprimento, índice em `terms`) de tudo que ele representa
+    matches: Dict[str, Tuple[Tuple[int, int], ...]] = field(hash=False, compare=False)
+    default_weight: int = 1
+    threshold_high: int = 5
+    threshold_medium: int = 3
+    required: Tuple[str, ...] = ()
+    recommendations: Tuple[str, ...] = ()
+
+    @property
+    def stamp(self) -> str:
+        """Identificador gravado nos resultados para invalidar caches."""
+        return f"{self.name}@{self.version}"
+
+    def _hits(self, found: set) -> Dict[str, List[str]]:
+        hits: Dict[str, List[str]] = {}
+        for i, (_, bucket, display) in enumerate(self.terms):
+            if i in found:
+                hits.setdefault(bucket, []).append(display)
+        return hits
+
+    def keyword_hits(self, normalized: str) -> Dict[str, List[str]]:
+        found = set()
+        for m in self.matcher.finditer(normalized):
+            found.update(i for _, i in self.matches[m.group(1)])
+        return self._hits(found)
+
+    def keyword_spans(self, nt: NormalizedText, findings: "Findings") -> Dict[str, List[str]]:
+        """Registra cada ocorrência como span `kw:<bucket>` (em offsets do texto
+        original) e devolve os termos achados."""
+        to_original = nt.offsets.span_to_original
+        found = set()
+        for m in self.matcher.finditer(nt.text):
+            pos = m.start()
+            for n, i in self.matches[m.group(1)]:
+                found.add(i)
+                findings.add(KEYWORD_PREFIX + self.terms[i][1], *to_original(pos, pos + n))
+        return self._hits(found)
+
+    def severity(self, hits: Dict[str, List[str]], has_pii: bool) -> str:
+        score = self.weights.get("PII", self.default_weight) if has_pii else 0
+        for bucket in hits.keys():
+            score += self.weights.get(bucket, self.default_weight)
+        return "alto" if score >= self.threshold_high else "médio" if score >= self.threshold_medium else "baixo"
+
+_WORD_START = r"(?<!\w)"
+_WORD_END = r"(?!\w)"
+
+def _compile_matcher(terms: List[Tuple[str, str, str]]) -> Tuple[Pattern, Dict[str, Tuple[Tuple[int, int], ...]]]:
+    """Casa só palavras inteiras ("sod" não casa em "episodio") numa passada.
+    O lookahead deixa as ocorrências se sobreporem, como na busca termo a termo:
+    em cada posição casa o termo mais longo, e `matches` devolve também os termos
+    que são prefixo dele em fronteira de palavra ("acesso" em "acesso indevido")."""
+    distinct = sorted({t for t, _, _ in terms}, key=lambda t: (-len(t), t))
+    matcher = re.compile(
+        "(?=" + _WORD_START + "(" + "|".join(re.escape(t) for t in distinct) + ")" + _WORD_END + ")"
+    )
+    matches: Dict[str, Tuple[Tuple[int, int], ...]] = {}
+    for longer in distinct:
+        matches[longer] = tuple(
+            (len(term), i)
+            for i, (term, _, _) in enumerate(terms)
+            if term == longer or re.match(_WORD_START + re.escape(term) + _WORD_END, longer)
+        )
+    return matcher, matches
+
+def compile_pack(raw: bytes, source: str = "<memória>") -> RulePack:
+    try:
+        spec = json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        raise RulePackError(f"{source}: JSON inválido ({e})")
+    keywords = spec.get("keywords")
+    if not isinstance(keywords, dict) or not keywords:
+        raise RulePackError(f"{source}: 'keywords' deve ser um objeto não vazio")
+    name = spec.get("name") or os.path.splitext(os.path.basename(source))[0]
+
+    terms = []
+    seen = set()
+    for bucket, words in keywords.items():
+        for w in words:
+            term = fold(str(w))
+            if term and (term, bucket) not in seen:
+                seen.add((term, bucket))
+                terms.append((term, bucket, str(w)))
+    thresholds = spec.get("thresholds") or {}
+    matcher, matches = _compile_matcher(terms)
+    return RulePack(
+        name=name,
+        version=hashlib.sha256(_MATCHER_VERSION + raw).hexdigest()[:12],
+        description=spec.get("description", ""),
+        terms=tuple(terms),
+        buckets=tuple(keywords.keys()),
+        weights={k: int(v) for k, v in (spec.get("severity_weights") or {}).items()},
+        matcher=matcher,
+        matches=matches,
+        default_weight=int(spec.get("default_weight", 1)),
+        threshold_high=int(thresholds.get("alto", 5)),
+        threshold_medium=int(thresholds.get("médio", 3)),
+        required=tuple(fold(str(r)) for r in spec.get("required", [])),
+        recommendations=tuple(spec.get("recommendations", [])),
+    )
+
+class _Entry:
+    __slots__ = ("mtime_ns", "size", "checked", "pack")
+
+    def __init__(self, mtime_ns: int, size: int, checked: float, pack: RulePack):
+        self.mtime_ns, self.size, self.checked, self.pack = mtime_ns, size, checked, pack
+
+class RuleRegistry:
+    """Cache de pacotes compilados com recarga a quente: checa o mtime no máximo a
+    cada `reload_seconds` e só recompila se o arquivo mudou. Os pacotes são
+    indexados pelo `name` declarado no JSON (o mesmo de /rules e de `regras`),
+    não pelo nome do arquivo."""
+
+    def __init__(self, dirs: List[str], reload_seconds: float = 2.0):
+        self.dirs = dirs
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}  # por caminho
+        self._paths: Dict[str, str] = {}  # nome declarado -> caminho
+        self._scanned_at = 0.0
+
+    def _scan(self, force: bool = False) -> Dict[str, str]:
+        now = time.monotonic()
+        if self._paths and not force and now - self._scanned_at < self.reload_seconds:
+            return self._paths
+        paths: Dict[str, str] = {}
+        for d in self.dirs:  # diretórios posteriores (cliente) sobrepõem os anteriores
+            if not d or not os.path.isdir(d):
+                continue
+            for fn in sorted(os.listdir(d)):
+                if not fn.endswith(".json"):
+                    continue
+                path = os.path.join(d, fn)
+                try:
+                    name = self._load(path).name
+                except (OSError, RulePackError) as e:
+                    logger.warning("pacote de regras ignorado: %s", e)
+                    continue
+                if name in paths and os.path.dirname(paths[name]) == d:
+                    logger.warning("pacote %s declarado em %s e %s; vale o último", name, paths[name], path)
+                paths[name] = path
+        self._paths, self._scanned_at = paths, now
+        for path in set(self._entries) - set(paths.values()):
+            del self._entries[path]
+        return paths
+
+    def _load(self, path: str) -> RulePack:
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry:
+            if now - entry.checked < self.reload_seconds:
+                return entry.pack
+            st = os.stat(path)
+            if (st.st_mtime_ns, st.st_size) == (entry.mtime_ns, entry.size):
+                entry.checked = now
+                return entry.pack
+        st = os.stat(path)
+        with open(path, "rb") as fh:
+            pack = compile_pack(fh.read(), path)
+        if entry and entry.pack.version == pack.version:
+            pack = entry.pack
+        self._entries[path] = _Entry(st.st_mtime_ns, st.st_size, now, pack)
+        return pack
+
+    def get(self, name: Optional[str] = None) -> RulePack:
+        name = name or settings.default_rule_pack
+        with self._lock:
+            path = self._scan().get(name)
+            if path is not None:
+                pack = self._load(path)
+                if pack.name == name:
+                    return pack
+            # arquivo novo ou `name` alterado desde a última varredura
+            path = self._scan(force=True).get(name)
+            if path is None:
+                raise RulePackError(f"Pacote de regras não encontrado: {name}")
+            return self._load(path)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._scan().keys())
+
+    def all(self) -> List[RulePack]:
+        return [self.get(n) for n in self.names()]
+
+registry = RuleRegistry([BUILTIN_DIR, settings.rules_dir], settings.rules_reload_seconds)
+
+def get_pack(name: Optional[str] = None) -> RulePack:
+    return registry.get(name)
+
+def load_pack_file(path: str) -> RulePack:
+    with open(path, "rb") as fh:
+        return compile_pack(fh.read(), path)
+
+def pack_info(pack: RulePack) -> Dict[str, Any]:
+    return {
+        "name": pack.name,
+        "version": pack.version,
+        "description": pack.description,
+        "buckets": list(pack.buckets),
+    }
@@ -0,0 +1,188 @@
+# backend/app/services/runs.py
+# Execuções de análise persistidas: cada run grava um Analysis com um
+# AnalysisFinding por documento e os agregados do projeto já calculados.
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from ..models import Analysis, AnalysisFinding, Document, Project
+from .analyses import analyze_document
+from .rules import RulePack, get_pack
+from . import stats
+from ..utils.normalize import NORMALIZER_VERSION
+from ..utils.tracing import span
+
+SEVERITY_LEVELS = ("alto", "médio", "baixo")
+_TOP_BUCKETS = 10
+_BATCH_SIZE = 200
+
+def _pii_counts(result: Dict[str, Any]) -> Dict[str, int]:
+    achados = result.get("achados") or {}
+    counts = achados.get("pii_contagem")
+    if isinstance(counts, dict):
+        return {k: int(v) for k, v in counts.items()}
+    # resultado refinado pelo LLM pode não trazer contagens: usa as amostras
+    pii = achados.get("pii") or {}
+    return {k: len(v) for k, v in pii.items() if isinstance(v, list) and v}
+
+def _keyword_buckets(result: Dict[str, Any]) -> Dict[str, List[str]]:
+    kw = (result.get("achados") or {}).get("palavras_chave") or {}
+    return kw if isinstance(kw, dict) else {}
+
+def finding_from_result(doc: Document, result: Dict[str, Any]) -> AnalysisFinding:
+    return AnalysisFinding(
+        document_id=doc.id,
+        title=doc.title,
+        document_created_at=doc.created_at,
+        document_revision=doc.revision or 1,
+        severity=str(result.get("severidade") or "baixo"),
+        pii_counts=_pii_counts(result),
+        keyword_buckets=_keyword_buckets(result),
+        recommendations=list(result.get("recomendacoes") or []),
+        result=result,
+    )
+
+def finding_to_doc_result(f: AnalysisFinding) -> Dict[str, Any]:
+    """Formato de AnalysisDocResult (mesmo contrato de /analyses/run)."""
+    return {
+        "document_id": f.document_id,
+        "title": f.title,
+        "created_at": f.document_created_at,
+        "result": f.result,
+    }
+
+def doc_results(findings: List[AnalysisFinding]) -> List[Dict[str, Any]]:
+    """Achados no formato da API, sem os de documentos removidos depois do run
+    (document_id NULL pelo ON DELETE SET NULL; o contrato exige um id)."""
+    return [finding_to_doc_result(f) for f in findings if f.document_id is not None]
+
+class RollupBuilder:
+    """Acumula os agregados do projeto à medida que os achados são gravados."""
+
+    def __init__(self):
+        self.documents = 0
+        self.severity = Counter({lvl: 0 for lvl in SEVERITY_LEVELS})
+        self.pii = Counter()
+        self.buckets = Counter()
+
+    def add(self, f: AnalysisFinding) -> None:
+        self.documents += 1
+        self.severity[f.severity] += 1
+        self.pii.update(f.pii_counts or {})
+        self.buckets.update((f.keyword_buckets or {}).keys())
+
+    def build(self) -> Dict[str, Any]:
+        return {
+            "documentos": self.documents,
+            "severidade": dict(self.severity),
+            "pii": dict(self.pii),
+            "top_buckets": [{"bucket": b, "documentos": n} for b, n in self.buckets.most_common(_TOP_BUCKETS)],
+        }
+
+def summarize_rollup(rollup: Dict[str, Any]) -> str:
+    sev = rollup.get("severidade") or {}
+    lines = [
+        f"Documentos analisados: {rollup.get('documentos', 0)}",
+        "Severidade: " + ", ".join(f"{k}={sev.get(k, 0)}" for k in SEVERITY_LEVELS),
+    ]
+    pii = rollup.get("pii") or {}
+    if pii:
+        lines.append("PII: " + ", ".join(f"{k}={v}" for k, v in sorted(pii.items())))
+    top = rollup.get("top_buckets") or []
+    if top:
+        lines.append("Principais temas: " + ", ".join(t["bucket"] for t in top))
+    return "\n".join(lines)
+
+def project_pack(db: Session, project_id: int) -> RulePack:
+    name = db.query(Project.rule_pack).filter_by(id=project_id).scalar()
+    return get_pack(name)
+
+def is_stale(run: Analysis, pack: RulePack, documents_revision: int) -> bool:
+    """Run gerado com outra versão das regras ou antes da última mudança nos
+    documentos não serve mais como relatório atual. Runs sem a versão dos
+    documentos (anteriores à coluna) contam como desatualizados."""
+    return run.rules_version != pack.stamp or run.documents_revision != documents_revision
+
+def doc_payload(d: Document) -> Dict[str, Any]:
+    """Entrada de analyze_document a partir do ORM, com a forma normalizada da ingestão."""
+    payload = {
+        "id": d.id,
+        "title": d.title,
+        "content": d.content,
+        "created_at": d.created_at,
+    }
+    if d.features is not None and d.features.normalizer_version == NORMALIZER_VERSION:
+        payload["normalized"] = d.features.normalized
+    return payload
+
+def run_project_analysis(
+    db: Session,
+    project_id: int,
+    document_ids: Optional[List[int]] = None,
+) -> Analysis:
+    """Analisa os documentos, persiste o run e devolve o Analysis já commitado."""
+    pack = project_pack(db, project_id)
+    q = (
+        db.query(Document)
+        .options(selectinload(Document.chunks), selectinload(Document.features))
+        .filter_by(project_id=project_id)
+    )
+    if document_ids:
+        q = q.filter(Document.id.in_(document_ids))
+    q = q.order_by(Document.id.desc())
+
+    full = not document_ids
+    run = Analysis(
+        project_id=project_id,
+        status="running",
+        summary="",
+        rules_version=pack.stamp,
+        full_project=full,
+        # lida antes dos documentos: uma mudança durante o run o deixa desatualizado
+        documents_revision=stats.documents_version(db, project_id),
+    )
+    db.add(run)
+    db.flush()
+
+    rollup = RollupBuilder()
+    for i, d in enumerate(q.yield_per(_BATCH_SIZE), start=1):
+        with span("analyze_document", document_id=d.id):
+            result = analyze_document(doc_payload(d), pack=pack)
+        f = finding_from_result(d, result)
+        f.analysis_id = run.id
+        db.add(f)
+        rollup.add(f)
+        if i % _BATCH_SIZE == 0:
+            db.flush()  # não acumula o run inteiro na sessão
+
+    run.rollup = rollup.build()
+    run.document_count = rollup.documents
+    run.summary = summarize_rollup(run.rollup)
+    run.status = "completed"
+    run.finished_at = datetime.now(timezone.utc)
+    db.flush()
+    stats.analysis_completed(db, run, full=full)
+    db.commit()
+    return run
+
+def report_runs(db: Session, project_id: int):
+    """Runs que podem servir de relatório: concluídos e do projeto inteiro.
+    Um run parcial cobre só os documentos pedidos e esconderia os demais."""
+    return db.query(Analysis).filter(
+        Analysis.project_id == project_id,
+        Analysis.status == "completed",
+        Analysis.full_project.is_not(False),
+    )
+
+def latest_run(db: Session, project_id: int) -> Optional[Analysis]:
+    return report_runs(db, project_id).order_by(Analysis.id.desc()).first()
+
+def run_findings(db: Session, analysis_id: int) -> List[AnalysisFinding]:
+    return (
+        db.query(AnalysisFinding)
+        .filter_by(analysis_id=analysis_id)
+        .order_by(AnalysisFinding.id)
+        .all()
+    )
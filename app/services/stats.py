@@ -0,0 +1,143 @@
+# backend/app/services/stats.py
+# Estatísticas do projeto para o painel (ProjectStats), atualizadas no mesmo
+# commit da escrita que as altera: UPDATE atômico "coluna = coluna + delta",
+# sem ler-modificar-gravar e sem varrer os documentos.
+# Chame depois do flush da mudança no documento e antes do commit.
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Analysis, Document, DocumentContent, Project, ProjectStats, PROJECT_DELETING
+
+def document_bytes(db: Session, document_id: int) -> int:
+    return int(
+        db.query(func.coalesce(func.sum(DocumentContent.raw_size), 0))
+        .filter(DocumentContent.document_id == document_id)
+        .scalar()
+    )
+
+def rebuild_stats(db: Session, project_id: int) -> ProjectStats:
+    """Recalcula do zero (projetos antigos, sem linha de estatísticas)."""
+    count, total = db.execute(
+        select(func.count(func.distinct(Document.id)), func.coalesce(func.sum(DocumentContent.raw_size), 0))
+        .select_from(Document)
+        .outerjoin(DocumentContent, DocumentContent.document_id == Document.id)
+        .where(Document.project_id == project_id)
+    ).one()
+    stats = db.get(ProjectStats, project_id) or ProjectStats(project_id=project_id)
+    stats.document_count = int(count)
+    stats.total_bytes = int(total)
+    # chamado depois de uma mudança nos documentos: runs anteriores ficam desatualizados
+    stats.documents_revision = (stats.documents_revision or 0) + 1
+    run = (
+        db.query(Analysis)
+        .filter(
+            Analysis.project_id == project_id,
+            Analysis.status == "completed",
+            Analysis.full_project.is_not(False),
+        )
+        .order_by(Analysis.id.desc())
+        .first()
+    )
+    if run is not None:
+        _apply_run(stats, run)
+    stats.touch()
+    db.add(stats)
+    db.flush()
+    return stats
+
+def _bump(db: Session, project_id: int, documents: int, nbytes: int) -> None:
+    result = db.execute(
+        update(ProjectStats)
+        .where(ProjectStats.project_id == project_id)
+        .values(
+            document_count=ProjectStats.document_count + documents,
+            total_bytes=ProjectStats.total_bytes + nbytes,
+            documents_revision=func.coalesce(ProjectStats.documents_revision, 0) + 1,
+            revision=func.coalesce(ProjectStats.revision, 1) + 1,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        rebuild_stats(db, project_id)  # já enxerga a mudança (flush feito antes)
+
+def document_added(db: Session, project_id: int, nbytes: int) -> None:
+    _bump(db, project_id, 1, nbytes)
+
+def document_changed(db: Session, project_id: int, delta_bytes: int = 0) -> None:
+    # mesmo sem delta (só o título): o conjunto de documentos mudou
+    _bump(db, project_id, 0, delta_bytes)
+
+def document_removed(db: Session, project_id: int, nbytes: int) -> None:
+    _bump(db, project_id, -1, -nbytes)
+
+def documents_version(db: Session, project_id: int) -> int:
+    """Versão do conjunto de documentos do projeto (0 sem linha de estatísticas)."""
+    return int(
+        db.query(func.coalesce(ProjectStats.documents_revision, 0))
+        .filter(ProjectStats.project_id == project_id)
+        .scalar()
+        or 0
+    )
+
+def _apply_run(stats: ProjectStats, run: Analysis) -> None:
+    rollup = run.rollup or {}
+    stats.pii_totals = dict(rollup.get("pii") or {})
+    stats.severity_histogram = dict(rollup.get("severidade") or {})
+    stats.last_analysis_at = run.finished_at
+
+def analysis_completed(db: Session, run: Analysis, full: bool) -> None:
+    """PII e severidade só são trocados por um run do projeto inteiro; um run
+    parcial (document_ids) atualiza apenas o horário da última análise."""
+    values: Dict[str, Any] = {
+        "last_analysis_at": run.finished_at,
+        "revision": func.coalesce(ProjectStats.revision, 1) + 1,
+        "updated_at": func.now(),
+    }
+    if full:
+        rollup = run.rollup or {}
+        values["pii_totals"] = dict(rollup.get("pii") or {})
+        values["severity_histogram"] = dict(rollup.get("severidade") or {})
+    result = db.execute(
+        update(ProjectStats)
+        .where(ProjectStats.project_id == run.project_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        rebuild_stats(db, run.project_id)
+
+def project_stats(db: Session, project_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Uma consulta para o painel inteiro (projeto + linha de estatísticas)."""
+    q = (
+        db.query(Project.id, Project.name, Project.description, ProjectStats)
+        .outerjoin(ProjectStats, ProjectStats.project_id == Project.id)
+        .filter(Project.status.is_distinct_from(PROJECT_DELETING))
+    )
+    if project_ids is not None:
+        q = q.filter(Project.id.in_(project_ids))
+    out = []
+    for pid, name, description, stats in q.order_by(Project.id.desc()):
+        out.append({
+            "project_id": pid,
+            "name": name,
+            "description": description,
+            "document_count": stats.document_count if stats else 0,
+            "total_bytes": stats.total_bytes if stats else 0,
+            "pii_totals": (stats.pii_totals if stats else None) or {},
+            "severity_histogram": (stats.severity_histogram if stats else None) or {},
+            "last_analysis_at": stats.last_analysis_at if stats else None,
+        })
+    return out
+
+def stats_version(db: Session) -> tuple:
+    """Versão do painel para ETag: muda com qualquer estatística ou projeto."""
+    active = Project.status.is_distinct_from(PROJECT_DELETING)
+    return db.query(
+        func.count(Project.id),
+        func.max(Project.id),
+        func.sum(func.coalesce(Project.revision, 1)),
+        func.sum(func.coalesce(ProjectStats.revision, 0)),
+    ).outerjoin(ProjectStats, ProjectStats.project_id == Project.id).filter(active).one()
@@ -0,0 +1,48 @@
+# backend/app/utils/compression.py
+import zlib
+from typing import Tuple
+
+# zstd é opcional: se o pacote não estiver instalado, usa zlib
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+CODEC_NONE = "none"
+
+_ZLIB_LEVEL = 6
+_ZSTD_LEVEL = 10
+
+def available_codec(preferred: str) -> str:
+    if preferred == CODEC_ZSTD and zstandard is None:
+        return CODEC_ZLIB
+    if preferred not in (CODEC_ZLIB, CODEC_ZSTD, CODEC_NONE):
+        return CODEC_ZLIB
+    return preferred
+
+def compress_text(text: str, codec: str = CODEC_ZLIB) -> Tuple[str, bytes]:
+    """Comprime o texto e devolve (codec efetivamente usado, bytes)."""
+    raw = (text or "").encode("utf-8")
+    codec = available_codec(codec)
+    if codec == CODEC_ZSTD:
+        return codec, zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(raw)
+    if codec == CODEC_NONE:
+        return codec, raw
+    return CODEC_ZLIB, zlib.compress(raw, _ZLIB_LEVEL)
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if not data:
+        return ""
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Dependência ausente: zstandard")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == CODEC_ZLIB:
+        raw = zlib.decompress(data)
+    elif codec == CODEC_NONE:
+        raw = bytes(data)
+    else:
+        raise ValueError(f"Codec desconhecido: {codec}")
+    return raw.decode("utf-8")
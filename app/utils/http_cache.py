@@ -0,0 +1,51 @@
+# backend/app/utils/http_cache.py
+# Requisições condicionais: ETag (fraca) + Last-Modified, respondendo 304 antes
+# de montar/serializar o corpo. "private, no-cache": o cliente pode guardar a
+# resposta, mas revalida a cada uso — 304 custa só a consulta da versão.
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def _utc(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    lm = _utc(last_modified)
+    if lm is not None:
+        headers["Last-Modified"] = format_datetime(lm.replace(microsecond=0), usegmt=True)
+    return headers
+
+def _weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:  # If-None-Match tem precedência sobre If-Modified-Since
+        return inm.strip() == "*" or _weak(etag) in {_weak(t) for t in inm.split(",")}
+    ims = request.headers.get("if-modified-since")
+    lm = _utc(last_modified)
+    if ims and lm is not None:
+        try:
+            return lm.replace(microsecond=0) <= parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """Resposta 304 se a cópia do cliente ainda vale; None para seguir com a rota."""
+    if is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=cache_headers(etag, last_modified))
+    return None
@@ -0,0 +1,152 @@
+# backend/app/utils/normalize.py
+# Normalização para busca: casefold, remoção de acentos e espaços colapsados,
+# com mapa de offsets de volta ao texto original (para evidências/destaque).
+import re
+import unicodedata
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict
+
+NORMALIZER_VERSION = "2"
+
+_WS_RUN = re.compile(r"\s+")
+_WS_MULTI = re.compile(r"\s{2,}")
+_TOKEN = re.compile(r"\w+")
+
+@lru_cache(maxsize=4096)
+def _fold_char(c: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", c.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+class _FoldTable(dict):
+    """Tabela para str.translate preenchida sob demanda (o laço fica em C).
+    `irregular` guarda os caracteres que não dobram para exatamente um (ß -> ss,
+    acento solto -> ""): com eles o mapa de offsets não é linear."""
+    def __init__(self):
+        super().__init__()
+        self.irregular = set()
+
+    def __missing__(self, code: int) -> str:
+        c = chr(code)
+        f = " " if c.isspace() else _fold_char(c)
+        if len(f) != 1:
+            self.irregular.add(c)
+        self[code] = f
+        return f
+
+_FOLD_TABLE = _FoldTable()
+
+def fold(s: str) -> str:
+    """Forma normalizada de um termo curto (regras, buscas)."""
+    return _WS_RUN.sub(" ", "".join(_fold_char(c) for c in s)).strip()
+
+class OffsetMap:
+    """Mapa normalizado -> original guardado como âncoras (norm, orig): entre duas
+    âncoras o deslocamento é linear, então o mapa só cresce onde algo muda
+    (espaços colapsados, acentos que não são 1:1)."""
+    __slots__ = ("norm", "orig")
+
+    def __init__(self):
+        self.norm = array("I")
+        self.orig = array("I")
+
+    def add(self, n: int, o: int) -> None:
+        if self.norm and o - self.orig[-1] == n - self.norm[-1]:
+            return
+        self.norm.append(n)
+        self.orig.append(o)
+
+    def to_original(self, n: int) -> int:
+        i = bisect_right(self.norm, n) - 1
+        if i < 0:
+            return n
+        return self.orig[i] + (n - self.norm[i])
+
+    def span_to_original(self, start: int, end: int):
+        return self.to_original(start), self.to_original(end - 1) + 1
+
+    def to_bytes(self) -> bytes:
+        inter = array("I", [0]) * (2 * len(self.norm))
+        inter[0::2] = self.norm
+        inter[1::2] = self.orig
+        return inter.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "OffsetMap":
+        m = cls()
+        inter = array("I")
+        inter.frombytes(data)
+        m.norm = inter[0::2]
+        m.orig = inter[1::2]
+        return m
+
+@dataclass
+class NormalizedText:
+    text: str
+    offsets: OffsetMap
+    stats: Dict[str, int] = field(default_factory=dict)
+
+def _normalize_linear(folded: str, offsets: OffsetMap) -> str:
+    """Caso comum: dobra 1:1 (len(folded) == len(original)). Só sequências de
+    2+ espaços e as bordas quebram a linearidade."""
+    lead = len(folded) - len(folded.lstrip(" "))
+    body = folded.strip(" ")
+    offsets.add(0, lead)
+    pieces = []
+    last = 0
+    n = 0
+    for m in _WS_MULTI.finditer(body):
+        pieces.append(body[last:m.start() + 1])
+        n += m.start() + 1 - last
+        last = m.end()
+        offsets.add(n, lead + last)
+    pieces.append(body[last:])
+    return "".join(pieces)
+
+def _normalize_general(text: str, offsets: OffsetMap) -> str:
+    out = []
+    n = 0
+    pos = 0
+    pending_space = False
+    for m in _WS_RUN.finditer(text + " "):
+        run_start, run_end = pos, m.start()
+        if run_start < run_end:
+            if pending_space and n:
+                offsets.add(n, run_start - 1)
+                out.append(" ")
+                n += 1
+            # expansão/remoção de caracteres (ß -> ss, acentos soltos): caractere a caractere
+            for i in range(run_start, run_end):
+                for ch in _FOLD_TABLE[ord(text[i])]:
+                    offsets.add(n, i)
+                    out.append(ch)
+                    n += 1
+        pending_space = True
+        pos = m.end()
+    return "".join(out)
+
+def normalize_text(text: str) -> NormalizedText:
+    text = text or ""
+    offsets = OffsetMap()
+    if text.isascii():
+        folded = text.lower().translate(_FOLD_TABLE)  # tabs/quebras de linha -> " "
+        linear = True
+    else:
+        folded = text.translate(_FOLD_TABLE)
+        # comprimento igual não basta: uma expansão e uma remoção se compensam
+        linear = _FOLD_TABLE.irregular.isdisjoint(set(text))
+    if linear:
+        normalized = _normalize_linear(folded, offsets)
+    else:
+        normalized = _normalize_general(text, offsets)
+    tokens = _TOKEN.findall(normalized)
+    stats = {
+        "char_count": len(text),
+        "normalized_chars": len(normalized),
+        "token_count": len(tokens),
+        "unique_tokens": len(set(tokens)),
+        "line_count": text.count("\n") + 1 if text else 0,
+    }
+    return NormalizedText(normalized, offsets, stats)
@@ -0,0 +1,40 @@
+# backend/app/utils/pagination.py
+# Quebra de texto em páginas e blocos (chunks) endereçáveis por offset.
+# Invariante: "".join(páginas) == texto original, para que offsets sejam exatos.
+from typing import List, Tuple
+
+def paginate_text(text: str, page_chars: int) -> List[str]:
+    """Divide texto sem paginação própria (TXT/DOCX/editor) em páginas de ~page_chars,
+    preferindo quebrar em fim de linha."""
+    text = text or ""
+    if len(text) <= page_chars:
+        return [text]
+    pages = []
+    start = 0
+    while start < len(text):
+        end = min(start + page_chars, len(text))
+        if end < len(text):
+            nl = text.rfind("\n", start + page_chars // 2, end)
+            if nl != -1:
+                end = nl + 1
+        pages.append(text[start:end])
+        start = end
+    return pages
+
+def join_extracted_pages(pages: List[str]) -> List[str]:
+    """Páginas vindas de um extrator (PDF) são unidas por "\\n"; o separador fica
+    no fim de cada página para manter a invariante de offsets."""
+    if not pages:
+        return [""]
+    return [p + "\n" for p in pages[:-1]] + [pages[-1]]
+
+def chunk_pages(pages: List[str], chunk_chars: int) -> List[Tuple[int, int, int, str]]:
+    """Gera (page, part, char_start, texto) com páginas numeradas a partir de 1."""
+    chunks = []
+    offset = 0
+    for page_no, page in enumerate(pages, start=1):
+        parts = [page[i:i + chunk_chars] for i in range(0, len(page), chunk_chars)] or [""]
+        for part_no, part in enumerate(parts):
+            chunks.append((page_no, part_no, offset, part))
+            offset += len(part)
+    return chunks
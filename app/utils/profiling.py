@@ -0,0 +1,118 @@
+# backend/app/utils/profiling.py
+# Profiling por requisição, sob demanda: com o cabeçalho `X-Profile: <PROFILE_TOKEN>`
+# a requisição é amostrada e o resultado gravado em PROFILE_DIR no formato
+# "collapsed stacks" (flamegraph.pl, speedscope, inferno), junto com os spans dela.
+# Sem token configurado o middleware nem é instalado.
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set
+
+from fastapi import Request
+
+from ..config import settings
+from . import tracing
+
+class SamplingProfiler:
+    """Amostra, a cada `interval` segundos, a pilha das threads em `threads`
+    (conjunto que pode crescer enquanto o profiler roda)."""
+
+    def __init__(self, threads: Set[int], interval: float = 0.005, exclude: Iterable[int] = ()):
+        self.threads = threads
+        self.interval = interval
+        self.exclude = set(exclude)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _label(self, code, module: str) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{module}:{code.co_name}:{code.co_firstlineno}".replace(";", ",").replace(" ", "_")
+            self._labels[code] = label
+        return label
+
+    def _collapse(self, frame) -> str:
+        parts = []
+        while frame is not None:
+            parts.append(self._label(frame.f_code, frame.f_globals.get("__name__", "?")))
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for tid in tuple(self.threads):
+                if tid == own or tid in self.exclude:
+                    continue
+                frame = frames.get(tid)
+                if frame is not None:
+                    self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+def _wants_profile(request: Request) -> bool:
+    token = settings.profile_token
+    if not token:
+        return False
+    # só no cabeçalho: na query string o token iria parar no access log
+    given = request.headers.get("x-profile")
+    return bool(given) and hmac.compare_digest(given, token)
+
+def _write_profile(profiler: SamplingProfiler, trace_id: str, spans) -> str:
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    base = os.path.join(settings.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{trace_id[:12]}")
+    with open(base + ".folded", "w", encoding="utf-8") as fh:
+        fh.write(profiler.folded())
+    with open(base + ".spans.json", "w", encoding="utf-8") as fh:
+        json.dump(spans, fh, ensure_ascii=False, default=str, indent=1)
+    return base + ".folded"
+
+async def trace_requests(request: Request, call_next):
+    """Middleware HTTP: trace por requisição (se TRACING_EXPORTER estiver ligado)
+    e perfil amostrado quando a requisição traz o token."""
+    profiled = _wants_profile(request)
+    if not profiled and not tracing.enabled():
+        return await call_next(request)
+
+    profiler = None
+    with tracing.trace("http.request", **{"http.method": request.method, "http.target": request.url.path}) as root:
+        if profiled:
+            # as rotas são síncronas e rodam no threadpool: a thread do event loop
+            # só espera, então fica de fora; as do threadpool entram pelo primeiro span
+            profiler = SamplingProfiler(
+                root.trace.threads,
+                settings.profile_interval_ms / 1000,
+                exclude={threading.get_ident()},
+            ).start()
+        try:
+            response = await call_next(request)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+        root.set_attribute("http.status_code", response.status_code)
+
+    response.headers["X-Trace-Id"] = root.trace.trace_id
+    if profiler is not None:
+        response.headers["X-Profile-File"] = _write_profile(profiler, root.trace.trace_id, root.trace.spans)
+        response.headers["X-Profile-Samples"] = str(profiler.samples)
+    return response
@@ -0,0 +1,106 @@
+# backend/app/utils/serialization.py
+# Caminho rápido de serialização para respostas grandes: evita o
+# jsonable_encoder do FastAPI (que percorre cada dict/lista em Python puro).
+#  - listas de ORM e resultados de análise -> TypeAdapter pré-montado (pydantic-core),
+#    que também valida o contrato já que a rota não passa pelo response_model
+#  - demais dicts JSON -> orjson direto
+#  - corpo acima de um limite -> brotli/gzip conforme Accept-Encoding
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from ..config import settings
+from ..schemas import AnalysisDocResult, AnalysisRunOut, DocumentOut, ProjectOut
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+# ---------- serializers pré-montados (montar um TypeAdapter custa caro) ----------
+PROJECTS = TypeAdapter(List[ProjectOut])
+DOCUMENTS = TypeAdapter(List[DocumentOut])
+ANALYSIS_RUNS = TypeAdapter(List[AnalysisRunOut])
+DOC_RESULTS = TypeAdapter(List[AnalysisDocResult])
+
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=_ORJSON_OPTS)
+    return json.dumps(data, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+
+def encode(data: Any, adapter: Optional[TypeAdapter] = None) -> bytes:
+    """Com `adapter`, valida (aceita objetos ORM) e serializa em Rust; sem ele,
+    `data` já deve ser JSON-compatível (dicts/listas/datetimes)."""
+    if adapter is not None:
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    return dumps(data)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse com orjson (cai para json se orjson não estiver instalado)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding -> {codificação: q}. Tokens inteiros (sem casar substring)."""
+    out: Dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        out[name] = q
+    return out
+
+def _pick_encoding(header: str) -> Optional[str]:
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in (("br", "gzip") if brotli is not None else ("gzip",)):  # empate: brotli
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+def _compress(request: Request, body: bytes) -> Tuple[bytes, Optional[str]]:
+    if len(body) < settings.response_compress_min_bytes:
+        return body, None
+    encoding = _pick_encoding(request.headers.get("accept-encoding", ""))
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.response_brotli_quality), "br"
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=settings.response_gzip_level), "gzip"
+    return body, None
+
+def fast_response(
+    request: Request,
+    data: Any,
+    adapter: Optional[TypeAdapter] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    body, encoding = _compress(request, encode(data, adapter))
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
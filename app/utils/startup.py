@@ -0,0 +1,46 @@
+# backend/app/utils/startup.py
+# Medição do tempo de partida (cold start) do processo até a API ficar pronta.
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger("app.startup")
+
+# importado no topo de app.main: marca o início da importação da aplicação
+IMPORTED_AT = time.time()
+summary: Dict[str, float] = {}
+# True quando o mestre do gunicorn (on_starting) já preparou esquema e seed:
+# os workers herdam o valor no fork e pulam essa etapa
+prepared_by_master = False
+
+def _process_started_at() -> Optional[float]:
+    """Instante (epoch) em que o processo nasceu, via /proc no Linux."""
+    try:
+        with open("/proc/self/stat") as fh:
+            fields = fh.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])  # campo 22 (starttime), contado após "comm)"
+        with open("/proc/stat") as fh:
+            btime = next(int(ln.split()[1]) for ln in fh if ln.startswith("btime"))
+        return btime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+@contextmanager
+def phase(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        summary[f"{name}_s"] = round(time.perf_counter() - t0, 4)
+
+def record_ready() -> Dict[str, float]:
+    now = time.time()
+    summary["import_to_ready_s"] = round(now - IMPORTED_AT, 4)
+    started = _process_started_at()
+    if started is not None:
+        summary["process_to_ready_s"] = round(now - started, 4)
+    summary["pid"] = os.getpid()
+    logger.info("startup pronto: %s", summary)
+    return summary
@@ -0,0 +1,240 @@
+# backend/app/utils/tracing.py
+# Spans no estilo OpenTelemetry (trace/span/pai, início e fim em ns, atributos),
+# sem dependência externa. Fora de um trace, span() devolve um objeto nulo
+# compartilhado: o custo desligado é um ContextVar.get() por chamada.
+#
+# Exportação (TRACING_EXPORTER): "none", "file" (JSONL em TRACING_FILE) ou
+# "http" (POST em lote para TRACING_ENDPOINT; `python -m app.utils.tracing
+# collect` sobe um coletor local que grava o que recebe em JSONL).
+import argparse
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from ..config import settings
+
+logger = logging.getLogger("app.tracing")
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional["Span"]] = ContextVar("trace_parent", default=None)
+# ids não precisam ser criptográficos; os.urandom por span pesava no perfil
+_ids = random.Random()
+
+def enabled() -> bool:
+    return settings.tracing_exporter != "none"
+
+def instrumented() -> bool:
+    """Os ganchos (middleware, eventos do SQLAlchemy) só são instalados se algo
+    pode consumi-los: exportador ligado ou profiling habilitado."""
+    return enabled() or bool(settings.profile_token)
+
+class Trace:
+    __slots__ = ("trace_id", "spans", "threads")
+
+    def __init__(self):
+        self.trace_id = f"{_ids.getrandbits(128):032x}"
+        self.spans: List[Dict[str, Any]] = []
+        # threads que executaram spans deste trace (o profiler amostra só elas)
+        self.threads: Set[int] = set()
+
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "start_ns", "status", "_token")
+
+    def __init__(self, trace: Trace, name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{_ids.getrandbits(64):016x}"
+        self.parent_id: Optional[str] = None
+        self.attributes = attributes
+        self.start_ns = 0
+        self.status = "ok"
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        parent = _parent.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self._token = _parent.set(self)
+        self.trace.threads.add(threading.get_ident())
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end_ns = time.time_ns()
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["exception.type"] = exc_type.__name__
+        if self._token is not None:
+            _parent.reset(self._token)
+            self._token = None
+        self.trace.spans.append({
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": end_ns,
+            "duration_ms": round((end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        })
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+_NOOP = _NoopSpan()
+
+def span(name: str, **attributes: Any):
+    t = _trace.get()
+    if t is None:
+        return _NOOP
+    return Span(t, name, attributes)
+
+@contextmanager
+def trace(name: str, export: bool = True, **attributes: Any) -> Iterator[Span]:
+    """Abre um trace com um span raiz; ao fechar, envia os spans ao exportador."""
+    t = Trace()
+    token = _trace.set(t)
+    try:
+        with Span(t, name, attributes) as root:
+            yield root
+    finally:
+        _trace.reset(token)
+        if export and enabled():
+            get_exporter().export(t.spans)
+
+# ---------------- exportadores ----------------
+
+class FileExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(s, ensure_ascii=False, default=str) + "\n" for s in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+class HttpExporter:
+    """Envia em segundo plano; se o coletor cair, descarta em vez de segurar a requisição."""
+
+    def __init__(self, endpoint: str, max_queue: int = 1000):
+        self.endpoint = endpoint
+        self._queue: "queue.Queue[List[Dict[str, Any]]]" = queue.Queue(max_queue)
+        threading.Thread(target=self._worker, name="trace-exporter", daemon=True).start()
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._queue.get()
+            body = json.dumps({"service": "auditoria-api", "spans": batch}, default=str).encode("utf-8")
+            req = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+            try:
+                urllib.request.urlopen(req, timeout=2).close()
+            except Exception as e:
+                logger.debug("falha ao exportar spans: %s", e)
+
+_exporter = None
+
+def get_exporter():
+    global _exporter
+    if _exporter is None:
+        if settings.tracing_exporter == "http":
+            _exporter = HttpExporter(settings.tracing_endpoint)
+        else:
+            _exporter = FileExporter(settings.tracing_file)
+    return _exporter
+
+# ---------------- SQLAlchemy ----------------
+
+def instrument_engine(engine) -> None:
+    """Um span "db.query" por execução no cursor (só quando há trace ativo)."""
+    from sqlalchemy import event
+
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        t = _trace.get()
+        if t is None or context is None:
+            return
+        s = Span(t, "db.query", {"db.system": system, "db.statement": statement[:500]})
+        context._trace_span = s.__enter__()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        s = getattr(context, "_trace_span", None)
+        if s is not None:
+            context._trace_span = None
+            s.set_attribute("db.rowcount", cursor.rowcount)
+            s.__exit__(None, None, None)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(ctx):
+        s = getattr(ctx.execution_context, "_trace_span", None)
+        if s is not None:
+            ctx.execution_context._trace_span = None
+            s.__exit__(type(ctx.original_exception), ctx.original_exception, None)
+
+# ---------------- coletor local (stand-in) ----------------
+
+def _collector(port: int, out: str) -> None:
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            try:
+                spans = json.loads(body).get("spans") or []
+            except Exception:
+                self.send_response(400)
+                self.end_headers()
+                return
+            with lock, open(out, "a", encoding="utf-8") as fh:
+                for s in spans:
+                    fh.write(json.dumps(s, ensure_ascii=False) + "\n")
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"coletor em http://0.0.0.0:{port}/v1/traces -> {os.path.abspath(out)}")
+    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m app.utils.tracing")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("collect", help="Coletor HTTP local que grava spans em JSONL")
+    c.add_argument("--port", type=int, default=4318)
+    c.add_argument("-o", "--output", default="traces.jsonl")
+    args = ap.parse_args(argv)
+    _collector(args.port, args.output)
+
+if __name__ == "__main__":
+    main()
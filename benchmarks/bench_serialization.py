@@ -0,0 +1,83 @@
+# benchmarks/bench_serialization.py
+# Compara o custo de serializar um relatório grande (List[AnalysisDocResult])
+# pelo caminho padrão do FastAPI e pelo caminho rápido de app/utils/serialization.
+#
+#   python -m benchmarks.bench_serialization [-n 10000] [-r 3]
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from app.utils import serialization
+from app.utils.serialization import DOC_RESULTS, dumps
+
+def _fake_result(i: int, rnd: random.Random) -> dict:
+    cpfs = [f"{rnd.randint(100, 999)}.{rnd.randint(100, 999)}.{rnd.randint(100, 999)}-{rnd.randint(10, 99)}" for _ in range(rnd.randint(0, 8))]
+    emails = [f"pessoa{rnd.randint(1, 10**6)}@empresa.com.br" for _ in range(rnd.randint(0, 8))]
+    spans = []
+    for k in range(rnd.randint(5, 40)):
+        s = rnd.randint(0, 200_000)
+        spans.extend((k % 4, s, s + rnd.randint(5, 30)))
+    return {
+        "document_id": i,
+        "title": f"Documento {i}",
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "result": {
+            "resumo": "Documento com dados pessoais e termos de retenção. " * 3,
+            "achados": {
+                "pii": {"cpf": cpfs, "email": emails, "cnpj": [], "telefone": []},
+                "pii_contagem": {"cpf": len(cpfs), "email": len(emails)},
+                "palavras_chave": {"retencao": ["retenção", "prazo"], "consentimento": ["consentimento"]},
+                "evidencias": {"tipos": ["cpf", "email", "kw:retencao", "kw:consentimento"], "spans": spans},
+            },
+            "severidade": rnd.choice(["alto", "médio", "baixo"]),
+            "recomendacoes": ["Revisar base legal do tratamento.", "Definir prazo de retenção."],
+            "regras": "lgpd@0123456789ab",
+        },
+    }
+
+def _time(fn, repeat: int):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best * 1000, out
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Benchmark de serialização de relatórios")
+    ap.add_argument("-n", type=int, default=10_000, help="Número de resultados no relatório")
+    ap.add_argument("-r", "--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    rnd = random.Random(42)
+    data = [_fake_result(i, rnd) for i in range(args.n)]
+
+    cases = {
+        "jsonable_encoder + json (padrão FastAPI)": lambda: json.dumps(
+            jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8"),
+        "TypeAdapter validate + dump_json": lambda: DOC_RESULTS.dump_json(DOC_RESULTS.validate_python(data)),
+        "orjson direto (fast_response)": lambda: dumps(data),
+    }
+    print(f"{args.n} resultados, melhor de {args.repeat} (orjson={'sim' if serialization.orjson else 'não'})")
+    body = b""
+    for name, fn in cases.items():
+        ms, body = _time(fn, args.repeat)
+        print(f"  {name:<42} {ms:9.1f} ms  {len(body) / 1e6:7.2f} MB")
+
+    print("bytes na rede:")
+    print(f"  {'sem compressão':<42} {len(body) / 1e6:7.2f} MB")
+    ms, gz = _time(lambda: gzip.compress(body, compresslevel=5), args.repeat)
+    print(f"  {'gzip -5':<42} {len(gz) / 1e6:7.2f} MB  {ms:9.1f} ms")
+    if serialization.brotli is not None:
+        ms, br = _time(lambda: serialization.brotli.compress(body, quality=4), args.repeat)
+        print(f"  {'brotli q4':<42} {len(br) / 1e6:7.2f} MB  {ms:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
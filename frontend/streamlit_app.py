@@ -1,6 +1,9 @@
-import os, io
+import os, io, time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Any, List, Dict
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional, Any, List, Dict, Tuple
+from urllib.parse import urlencode
 
 import streamlit as st
 import requests
@@ -23,13 +26,31 @@ ss.base_url = ss.get("base_url", os.environ.get("API_BASE_URL", "http://localhos
 ss.token = ss.get("token")
 ss.projects = ss.get("projects", [])
 ss.selected_project = ss.get("selected_project")
-ss.docs = ss.get("docs", [])
+ss.doc_cursors = ss.get("doc_cursors", [None])  # before_id de cada janela já visitada
+ss.doc_query = ss.get("doc_query", "")
 ss.selected_doc_id = ss.get("selected_doc_id")
 ss.analysis = ss.get("analysis")
-ss.doc_cache = ss.get("doc_cache", {})
+# LRU de janelas da lista: (projeto, busca, cursor) -> (instante, documentos, tem_mais)
+ss.doc_cache = ss.get("doc_cache") if isinstance(ss.get("doc_cache"), OrderedDict) else OrderedDict()
 ss.view = ss.get("view", "home")  # "home" | "project"
+ss.http_cache = ss.get("http_cache", OrderedDict())  # url -> (etag, corpo), por usuário
+ss.last_write = ss.get("last_write")  # X-Last-Write da última escrita deste usuário
 
 # ------------- helpers de API -------------
+HTTP_CACHE_MAX = 256
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    # conexões keep-alive reaproveitadas entre reruns (e entre usuários do mesmo servidor).
+    # Compartilhada, então sem cookies: o `last_write` de um usuário iria nas leituras
+    # de todos; o que é por usuário vai em cabeçalho, a partir de `ss`
+    sess = requests.Session()
+    sess.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
 def api(path: str, method: str = "GET", json: Optional[dict] = None, files=None, data=None) -> Any:
     url = ss.base_url.rstrip("/") + path
     headers = {"accept": "application/json"}
@@ -37,27 +58,85 @@ def api(path: str, method: str = "GET", json: Optional[dict] = None, files=None,
         headers["Authorization"] = f"Bearer {ss.token}"
     if json is not None:
         headers["Content-Type"] = "application/json"
+    if ss.last_write:
+        headers["X-Last-Write"] = ss.last_write  # leia-suas-escritas: primário logo após escrever
+    # GET condicional: com a cópia local ainda válida a API responde 304 sem corpo
+    key = (ss.token, url)
+    cached = ss.http_cache.get(key) if method == "GET" else None
+    if cached:
+        headers["If-None-Match"] = cached[0]
     try:
-        r = requests.request(method, url, json=json, files=files, data=data, headers=headers, timeout=60)
+        r = http_session().request(method, url, json=json, files=files, data=data, headers=headers, timeout=60)
     except requests.RequestException as e:
         st.error(f"Falha de conexão com a API: {e}")
         return None
+    if r.headers.get("X-Last-Write"):
+        ss.last_write = r.headers["X-Last-Write"]
+    if r.status_code == 304 and cached:
+        ss.http_cache.move_to_end(key)
+        return cached[1]
     if r.status_code >= 400:
         st.error(f"Erro {r.status_code}: {r.text}")
         return None
-    return r.json() if r.content else None
+    body = r.json() if r.content else None
+    etag = r.headers.get("ETag")
+    if method == "GET" and etag:
+        ss.http_cache[key] = (etag, body)
+        ss.http_cache.move_to_end(key)
+        while len(ss.http_cache) > HTTP_CACHE_MAX:
+            ss.http_cache.popitem(last=False)
+    return body
 
 def load_projects():
     ss.projects = api("/projects", "GET") or []
 
-def load_docs(pid: int):
-    ss.docs = api(f"/documents/{pid}", "GET") or []
+def load_project_stats() -> Dict[int, dict]:
+    # revalidado a cada rerun (ETag): sem mudanças, a API responde 304
+    return {s["project_id"]: s for s in (api("/projects/stats", "GET") or [])}
+
+DOC_PAGE_SIZE = 25
+DOC_CACHE_MAX = 40
+DOC_CACHE_TTL = 30  # s; depois disso a janela é revalidada (ETag) para ver mudanças de outros usuários
+SEARCH_MIN_CHARS = 2
+
+def fetch_doc_window(pid: int, query: str, before_id: Optional[int]) -> Tuple[List[dict], bool]:
+    """Uma janela da lista (busca e paginação no servidor). Pede uma linha a mais
+    para saber se há próxima página."""
+    key = (pid, query, before_id)
+    hit = ss.doc_cache.get(key)
+    if hit and time.monotonic() - hit[0] < DOC_CACHE_TTL:
+        ss.doc_cache.move_to_end(key)
+        return hit[1], hit[2]
+    params = {"limit": DOC_PAGE_SIZE + 1}
+    if before_id:
+        params["before_id"] = before_id
+    if query:
+        params["q"] = query
+    rows = api(f"/documents/{pid}?{urlencode(params)}", "GET")
+    if rows is None:
+        return [], False
+    docs, has_more = rows[:DOC_PAGE_SIZE], len(rows) > DOC_PAGE_SIZE
+    ss.doc_cache[key] = (time.monotonic(), docs, has_more)
+    ss.doc_cache.move_to_end(key)
+    while len(ss.doc_cache) > DOC_CACHE_MAX:
+        ss.doc_cache.popitem(last=False)
+    return docs, has_more
+
+def invalidate_docs(pid: int):
+    """Descarta as janelas em cache do projeto (após criar/editar/excluir)."""
+    for key in [k for k in ss.doc_cache if k[0] == pid]:
+        del ss.doc_cache[key]
+
+def reset_doc_window():
+    ss.doc_cursors = [None]
 
 def open_project(pid: int):
     ss.selected_project = pid
     ss.view = "project"
     ss.selected_doc_id = None
-    load_docs(pid)
+    ss.doc_query = ""
+    reset_doc_window()
+    invalidate_docs(pid)
     st.rerun()
 
 def add_text_document(pid: int, title: str, content: str) -> bool:
@@ -67,18 +146,24 @@ def add_text_document(pid: int, title: str, content: str) -> bool:
     payload = {"project_id": int(pid), "title": title.strip(), "content": content}
     resp = api("/documents", "POST", json=payload)
     if resp:
-        ss.doc_cache[resp.get("id", 0)] = content
         st.success("Documento criado")
-        load_docs(pid)
+        invalidate_docs(pid)
+        reset_doc_window()
         st.rerun()
         return True
     return False
 
-def get_doc_detail(doc_id: int):
-    return api(f"/documents/detail/{doc_id}", "GET")
+def get_doc_detail(doc_id: int, page: Optional[int] = None):
+    path = f"/documents/detail/{doc_id}"
+    if page:
+        path += f"?page={int(page)}"
+    return api(path, "GET")
 
-def update_doc(doc_id: int, title: str, content: str):
-    return api(f"/documents/{doc_id}", "PUT", json={"title": title, "content": content})
+def update_doc(doc_id: int, title: str, content: str, page: Optional[int] = None):
+    payload = {"title": title, "content": content}
+    if page:
+        payload["page"] = int(page)
+    return api(f"/documents/{doc_id}", "PUT", json=payload)
 
 def delete_doc(doc_id: int):
     return api(f"/documents/{doc_id}", "DELETE")
@@ -114,6 +199,12 @@ def extract_text_from_upload(file) -> str:
         return "\n".join(p.text for p in d.paragraphs)
     raise RuntimeError("Formato não suportado (PDF/DOCX/TXT)")
 
+def fmt_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
 def fmt_created(value) -> str:
     if not value:
         return "—"
@@ -194,6 +285,7 @@ if ss.view == "home":
 
     # Grid de cards
     if ss.projects:
+        stats = load_project_stats()
         cols = st.columns(4)
         for i, p in enumerate(ss.projects):
             with cols[i % 4]:
@@ -201,6 +293,16 @@ if ss.view == "home":
                     st.caption("PROJECT NAME")
                     st.markdown(f"**{p['name']}**")
                     st.caption(p.get("description") or "—")
+                    s = stats.get(p["id"])
+                    if s:
+                        st.caption(f"{s['document_count']} documento(s) · {fmt_bytes(s['total_bytes'])}")
+                        if s.get("last_analysis_at"):
+                            sev = s.get("severity_histogram") or {}
+                            pii = sum((s.get("pii_totals") or {}).values())
+                            st.caption(
+                                f"Alto {sev.get('alto', 0)} · Médio {sev.get('médio', 0)} · Baixo {sev.get('baixo', 0)}"
+                                f" · PII {pii} · {fmt_created(s['last_analysis_at'])}"
+                            )
                     b1, b2 = st.columns([1,1])
                     if b1.button("Abrir", key=f"open_{p['id']}", use_container_width=True):
                         open_project(p["id"])
@@ -238,16 +340,24 @@ else:
 
     # -------- esquerda: lista de documentos + criar/upload
     with left:
-        search = st.text_input("Buscar documento por título", key="doc_search", placeholder="Digite para filtrar")
-        if not ss.docs:
-            load_docs(ss.selected_project)
-        docs = ss.docs
-        if search and search.strip():
-            docs = [d for d in docs if search.lower() in d["title"].lower()]
+        # busca no servidor: o text_input só dispara ao confirmar (Enter/sair do campo),
+        # e termos curtos demais não geram consulta
+        search = st.text_input("Buscar documento por título", key="doc_search", placeholder="Digite e tecle Enter")
+        query = search.strip() if search and len(search.strip()) >= SEARCH_MIN_CHARS else ""
+        if query != ss.doc_query:
+            ss.doc_query = query
+            reset_doc_window()
+
+        # só a janela visível é buscada e desenhada
+        cursor = ss.doc_cursors[-1]
+        docs, has_more = fetch_doc_window(ss.selected_project, query, cursor)
+        if not docs and len(ss.doc_cursors) > 1:  # janela esvaziou (exclusões): volta uma
+            ss.doc_cursors.pop()
+            st.rerun()
 
         st.markdown("#### Documentos")
         if not docs:
-            st.info("Nenhum documento neste projeto.")
+            st.info("Nenhum documento encontrado." if query else "Nenhum documento neste projeto.")
         else:
             for d in docs:
                 created = fmt_created(d.get("created_at"))
@@ -277,12 +387,21 @@ else:
                                 st.success("Documento excluído")
                                 if ss.selected_doc_id == d["id"]:
                                     ss.selected_doc_id = None
-                                load_docs(ss.selected_project)
+                                invalidate_docs(ss.selected_project)
                                 st.rerun()
                         if c2.button("Cancelar", key=f"cancel_doc_{d['id']}"):
                             ss.to_delete_doc = None
                             st.rerun()
 
+            nav_prev, nav_label, nav_next = st.columns([1,2,1])
+            if nav_prev.button("‹", key="docs_prev", disabled=len(ss.doc_cursors) == 1, use_container_width=True):
+                ss.doc_cursors.pop()
+                st.rerun()
+            nav_label.caption(f"Página {len(ss.doc_cursors)}")
+            if nav_next.button("›", key="docs_next", disabled=not has_more, use_container_width=True):
+                ss.doc_cursors.append(docs[-1]["id"])
+                st.rerun()
+
         st.divider()
         with st.expander("Novo documento (texto)", expanded=False):
             with st.form("form_new_text_doc"):
@@ -329,24 +448,37 @@ else:
         if not ss.selected_doc_id:
             st.info("Selecione um documento para visualizar/editar.")
         else:
-            detail = get_doc_detail(ss.selected_doc_id)
+            # carrega só a página visível; o documento inteiro nunca trafega para o editor
+            page_key = f"page_{ss.selected_doc_id}"
+            page = ss.get(page_key, 1)
+            detail = get_doc_detail(ss.selected_doc_id, page)
             if not detail:
                 st.error("Não foi possível carregar o documento.")
             else:
-                colA, colB = st.columns([3,1])
+                total_pages = max(detail.get("total_pages") or 1, 1)
+                colA, colB, colC = st.columns([3,1,1])
                 with colA:
                     new_title = st.text_input("Título", value=detail["title"], key=f"title_{detail['id']}")
                 with colB:
                     created_display = fmt_created(detail.get("created_at"))
                     st.text_input("Criado em", value=created_display, disabled=True, key=f"created_{detail['id']}")
-                new_content = st.text_area("Conteúdo", value=detail["content"], height=320, key=f"content_{detail['id']}")
+                with colC:
+                    new_page = st.number_input(
+                        f"Página (de {total_pages})", min_value=1, max_value=total_pages,
+                        value=min(page, total_pages), step=1, key=f"pagesel_{detail['id']}",
+                    )
+                    if new_page != page:
+                        ss[page_key] = int(new_page)
+                        st.rerun()
+                st.caption(f"Caracteres {detail.get('range_start', 0)}–{detail.get('range_end', 0)} de {detail.get('total_chars', 0)}")
+                new_content = st.text_area("Conteúdo", value=detail["content"], height=320, key=f"content_{detail['id']}_{page}")
 
                 c1, c2, c3 = st.columns([1,1,6])
                 if c1.button("Salvar", key=f"save_{detail['id']}"):
-                    updated = update_doc(detail["id"], new_title, new_content)
+                    updated = update_doc(detail["id"], new_title, new_content, page)
                     if updated:
                         st.success("Documento atualizado")
-                        load_docs(ss.selected_project)
+                        invalidate_docs(ss.selected_project)
                         st.rerun()
                 if c2.button("Fechar", key="close_editor"):
                     ss.selected_doc_id = None
@@ -0,0 +1,33 @@
+# Execução de produção: gunicorn gerenciando workers uvicorn.
+#   gunicorn -c gunicorn.conf.py app.main:app
+# A aplicação é importada uma vez no processo mestre (preload) e os workers
+# nascem por fork já com tudo carregado; esquema e seed rodam só no mestre
+# (o startup de app.main os pula nos workers). Exclusões de projeto pendentes
+# são retomadas por cada worker; o purge_lock deixa só um executar cada uma.
+import os
+import multiprocessing
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+def on_starting(server):
+    from app.db import init_db
+    from app.routers.auth import seed_user
+    from app.utils import startup
+    with startup.phase("schema"):
+        init_db()
+    with startup.phase("seed"):
+        seed_user()
+    startup.prepared_by_master = True  # herdado pelos workers no fork
+
+def post_fork(server, worker):
+    # conexões abertas no mestre não podem ser compartilhadas com os filhos
+    from app.db import engine, replicas
+    engine.dispose(close=False)
+    replicas.dispose()
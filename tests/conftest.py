@@ -0,0 +1,31 @@
+# backend/tests/conftest.py
+# A API roda contra um SQLite temporário (um arquivo por sessão de testes).
+# DATABASE_URL precisa estar definido antes do primeiro import de `app`.
+#
+#   python -m pytest -q
+import os
+import tempfile
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="auditoria-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ.setdefault("SEED_ADMIN", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def project(client):
+    return client.post("/projects", json={"name": "Projeto de teste"}).json()
+
+def add_document(client, project_id: int, content: str, title: str = "doc") -> dict:
+    r = client.post("/documents", json={"project_id": project_id, "title": title, "content": content})
+    assert r.status_code == 200, r.text
+    return r.json()
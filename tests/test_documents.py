@@ -0,0 +1,82 @@
+import pytest
+
+from app.db import SessionLocal
+from app.models import Project, PROJECT_DELETING
+from app.services import purge
+from app.services.purge import purge_lock, purge_project
+from conftest import add_document
+
+def _pages(n: int) -> str:
+    # DOCUMENT_PAGE_CHARS padrão = 4000: uma linha longa por página
+    return "".join(f"página {i} " + "x" * 3990 + "\n" for i in range(1, n + 1))
+
+def test_replace_page_beyond_end_is_rejected(client, project):
+    d = add_document(client, project["id"], _pages(3))
+    total = client.get(f"/documents/detail/{d['id']}").json()["total_pages"]
+
+    r = client.put(f"/documents/{d['id']}", json={"content": "longe\n", "page": total + 5})
+    assert r.status_code == 400
+    assert client.get(f"/documents/detail/{d['id']}").json()["total_pages"] == total
+
+def test_replace_page_can_append_next_page(client, project):
+    d = add_document(client, project["id"], _pages(3))
+    total = client.get(f"/documents/detail/{d['id']}").json()["total_pages"]
+
+    r = client.put(f"/documents/{d['id']}", json={"content": "nova\n", "page": total + 1})
+    assert r.status_code == 200
+    body = client.get(f"/documents/detail/{d['id']}").json()
+    assert body["total_pages"] == total + 1
+    assert body["content"].endswith("nova\n")
+
+def test_project_being_deleted_rejects_document_access(client, project):
+    pid = project["id"]
+    d = add_document(client, pid, "texto\n")
+    with SessionLocal() as db:
+        db.get(Project, pid).status = PROJECT_DELETING
+        db.commit()
+
+    assert client.get(f"/documents/{pid}").status_code == 404
+    assert client.get(f"/documents/detail/{d['id']}").status_code == 404
+    assert client.put(f"/documents/{d['id']}", json={"title": "novo"}).status_code == 404
+    assert client.delete(f"/documents/{d['id']}").status_code == 404
+    assert client.post("/analyses/run", json={"project_id": pid}).status_code == 404
+
+def test_purge_runs_once_per_project(client, project):
+    with purge_lock(project["id"]) as acquired:
+        assert acquired
+        assert purge_project(project["id"]) == 0  # já em andamento: não entra
+    assert client.get(f"/projects/{project['id']}/stats").status_code == 200
+
+def test_repeated_delete_retries_failed_purge(client, project, monkeypatch):
+    pid = project["id"]
+    add_document(client, pid, "texto\n")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("falha simulada")
+
+    monkeypatch.setattr(purge, "delete_documents", fail)
+    with pytest.raises(RuntimeError):
+        client.delete(f"/projects/{pid}")
+    monkeypatch.undo()
+    with SessionLocal() as db:
+        assert db.get(Project, pid).status == PROJECT_DELETING
+
+    assert client.delete(f"/projects/{pid}").status_code == 202
+    with SessionLocal() as db:
+        assert db.get(Project, pid) is None
+
+def test_document_list_etag_follows_every_change(client, project):
+    pid = project["id"]
+    d = add_document(client, pid, "texto\n")
+    etags = [client.get(f"/documents/{pid}?limit=25").headers["ETag"]]
+
+    client.put(f"/documents/{d['id']}", json={"title": "só o título"})
+    etags.append(client.get(f"/documents/{pid}?limit=25").headers["ETag"])
+    r = client.get(f"/documents/{pid}?limit=25", headers={"If-None-Match": etags[-1]})
+    assert r.status_code == 304
+
+    add_document(client, pid, "outro\n")
+    etags.append(client.get(f"/documents/{pid}?limit=25").headers["ETag"])
+    client.delete(f"/documents/{d['id']}")
+    etags.append(client.get(f"/documents/{pid}?limit=25").headers["ETag"])
+    assert len(set(etags)) == 4
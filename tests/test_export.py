@@ -0,0 +1,65 @@
+import csv
+import gzip
+import io
+import json
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+from app.services.export import COLUMNS
+from conftest import add_document
+
+TEXT = "Contrato com consentimento. CPF 123.456.789-09 e email a@b.com.\n"
+_NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+def _rows_csv(body: bytes):
+    return list(csv.reader(io.StringIO(body.decode("utf-8-sig"))))
+
+def _rows_xlsx(body: bytes):
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert zf.testzip() is None
+        sheet = ElementTree.fromstring(zf.read("xl/worksheets/sheet1.xml"))
+    rows = []
+    for row in sheet.iterfind(".//m:row", _NS):
+        cells = []
+        for c in row.iterfind("m:c", _NS):
+            v = c.find("m:v", _NS)
+            cells.append(v.text if v is not None else "".join(c.itertext()))
+        rows.append(cells)
+    return rows
+
+@pytest.fixture
+def docs(client, project):
+    pid = project["id"]
+    return [add_document(client, pid, TEXT, title=f"<doc & {i}>") for i in range(3)]
+
+@pytest.mark.parametrize("source", ["latest", "live"])
+def test_csv_export(client, project, docs, source):
+    if source == "latest":
+        client.get(f"/reports/{project['id']}")  # grava o run lido pela exportação
+    r = client.get(f"/reports/{project['id']}/export?format=csv&source={source}")
+    assert r.status_code == 200
+    rows = _rows_csv(r.content)
+    assert rows[0] == COLUMNS
+    assert sorted(int(row[0]) for row in rows[1:]) == sorted(d["id"] for d in docs)
+    by_name = dict(zip(COLUMNS, rows[1]))
+    assert by_name["pii_cpf"] == "1" and by_name["pii_email"] == "1"
+
+def test_jsonl_export(client, project, docs):
+    r = client.get(f"/reports/{project['id']}/export?format=jsonl")
+    records = [json.loads(line) for line in r.text.splitlines()]
+    assert sorted(rec["document_id"] for rec in records) == sorted(d["id"] for d in docs)
+    assert all(rec["pii_counts"] == {"cpf": 1, "email": 1} for rec in records)
+
+def test_xlsx_export(client, project, docs):
+    r = client.get(f"/reports/{project['id']}/export?format=xlsx")
+    rows = _rows_xlsx(r.content)
+    assert rows[0] == COLUMNS
+    assert sorted(int(row[0]) for row in rows[1:]) == sorted(d["id"] for d in docs)
+    assert {row[1] for row in rows[1:]} == {f"<doc & {i}>" for i in range(3)}
+
+def test_gzip_export(client, project, docs):
+    r = client.get(f"/reports/{project['id']}/export?format=jsonl&gzip=true")
+    assert r.headers["content-type"] == "application/gzip"
+    assert len(gzip.decompress(r.content).decode("utf-8").splitlines()) == len(docs)
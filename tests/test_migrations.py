@@ -0,0 +1,15 @@
+from app.migrations import schema_fingerprint
+from app.models import AnalysisFinding, Document
+
+def test_fingerprint_covers_foreign_key_actions(monkeypatch):
+    before = schema_fingerprint()
+    assert schema_fingerprint() == before
+
+    fk = next(iter(AnalysisFinding.__table__.c.document_id.foreign_keys)).constraint
+    monkeypatch.setattr(fk, "ondelete", "CASCADE")
+    assert schema_fingerprint() != before
+
+def test_fingerprint_covers_server_defaults(monkeypatch):
+    before = schema_fingerprint()
+    monkeypatch.setattr(Document.__table__.c.created_at, "server_default", None)
+    assert schema_fingerprint() != before
@@ -0,0 +1,19 @@
+import pytest
+
+from app.utils.normalize import normalize_text
+
+# ß -> "ss" (+1) e acento combinante solto -> "" (-1): mesmo comprimento, offsets deslocados
+STRASSE = "Stra\u00dfe e\u0301 cpf"
+
+@pytest.mark.parametrize("text, term, original", [
+    (STRASSE, "strasse", "Straße"),
+    (STRASSE, "e cpf", "e\u0301 cpf"),
+    ("Consentimento  do   titular", "do titular", "do   titular"),
+    ("Revogação de acesso", "revogacao", "Revogação"),
+    ("\tRetenção\nde dados", "retencao de", "Retenção\nde"),
+])
+def test_offsets_round_trip(text, term, original):
+    nt = normalize_text(text)
+    i = nt.text.index(term)
+    s, e = nt.offsets.span_to_original(i, i + len(term))
+    assert text[s:e] == original
@@ -0,0 +1,15 @@
+from sqlalchemy import select
+
+from app.db import engine
+from app.models import Document
+from app.query_plans import check_plans, explain
+
+def test_hot_queries_use_indexes(client):
+    assert check_plans(engine) == []
+
+def test_full_index_scan_is_not_an_index_lookup(client):
+    # ORDER BY servido percorrendo ix_documents_project_id_id inteiro: "SCAN ... USING INDEX"
+    stmt = select(Document.id).where(Document.title == "x").order_by(Document.project_id, Document.id)
+    with engine.connect() as conn:
+        scans, plan = explain(conn, stmt)
+    assert scans == ["documents"], plan
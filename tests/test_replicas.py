@@ -0,0 +1,27 @@
+from sqlalchemy import event, text
+
+import app.db as db_module
+from app.db import ReplicaPool, read_session
+
+def test_read_session_checks_out_once_and_skips_dead_replica(tmp_path, monkeypatch):
+    pool = ReplicaPool([f"sqlite:///{tmp_path}/nao/existe.db", f"sqlite:///{tmp_path}/replica.db"], cooldown=60)
+    dead, alive = pool.engines
+    checkouts = []
+    event.listen(alive, "checkout", lambda *a: checkouts.append(1))
+    monkeypatch.setattr(db_module, "replicas", pool)
+
+    for _ in range(4):
+        db = read_session()
+        assert db.get_bind() is alive
+        assert db.execute(text("SELECT 1")).scalar() == 1
+        db.close()
+
+    assert len(checkouts) == 4  # uma por sessão: sem sonda extra
+    assert [r["healthy"] for r in pool.status()] == [False, True]
+
+def test_read_session_falls_back_to_primary(tmp_path, monkeypatch):
+    pool = ReplicaPool([f"sqlite:///{tmp_path}/nao/existe.db"], cooldown=60)
+    monkeypatch.setattr(db_module, "replicas", pool)
+    db = read_session()
+    assert db.get_bind() is db_module.engine
+    db.close()
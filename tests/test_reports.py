@@ -0,0 +1,74 @@
+from conftest import add_document
+
+TEXT = "Contrato com consentimento. CPF 123.456.789-09 e email a@b.com.\n"
+
+def test_partial_run_does_not_replace_project_report(client, project):
+    pid = project["id"]
+    docs = [add_document(client, pid, TEXT, title=f"doc {i}") for i in range(3)]
+
+    assert client.post("/analyses/run", json={"project_id": pid}).status_code == 200
+    r = client.post("/analyses/run", json={"project_id": pid, "document_ids": [docs[0]["id"]]})
+    assert r.status_code == 200
+    assert [x["document_id"] for x in r.json()] == [docs[0]["id"]]
+
+    report = client.get(f"/reports/{pid}").json()
+    assert sorted(x["document_id"] for x in report) == sorted(d["id"] for d in docs)
+
+    runs = client.get(f"/reports/{pid}/runs").json()
+    assert [run["full_project"] for run in runs] == [False, True]
+    # o relatório veio do run completo, sem analisar de novo
+    assert len(runs) == 2
+
+    ev = client.get(f"/reports/{pid}/documents/{docs[2]['id']}/evidence?tipo=cpf")
+    assert ev.status_code == 200 and ev.json()
+
+def test_evidence_pages_past_stored_spans(client, project):
+    pid = project["id"]
+    cpfs = [f"{i:03d}.456.789-{i % 100:02d}" for i in range(50)]
+    d = add_document(client, pid, "".join(f"linha {i}: CPF {c}\n" for i, c in enumerate(cpfs)))
+    report = client.get(f"/reports/{pid}").json()
+
+    stored = report[0]["result"]["achados"]["evidencias"]
+    assert stored["contagem"]["cpf"] == 50
+    assert len(stored["spans"]) // 3 == 20
+
+    seen = []
+    for offset in (0, 20, 40):
+        r = client.get(f"/reports/{pid}/documents/{d['id']}/evidence?tipo=cpf&window=0&offset={offset}&limit=20")
+        assert r.status_code == 200
+        assert r.headers["X-Total-Count"] == "50"
+        seen += [e["trecho"] for e in r.json()]
+    assert seen == cpfs
+
+def test_evidence_after_edit_is_a_conflict(client, project):
+    pid = project["id"]
+    d = add_document(client, pid, TEXT)
+    client.get(f"/reports/{pid}")
+    assert client.get(f"/reports/{pid}/documents/{d['id']}/evidence").status_code == 200
+
+    client.put(f"/documents/{d['id']}", json={"content": "outro texto. " + TEXT})
+    assert client.get(f"/reports/{pid}/documents/{d['id']}/evidence").status_code == 409
+
+def test_report_follows_document_changes(client, project):
+    pid = project["id"]
+    a = add_document(client, pid, TEXT, title="a")
+    b = add_document(client, pid, TEXT, title="b")
+    first = client.get(f"/reports/{pid}")
+    assert sorted(x["document_id"] for x in first.json()) == sorted([a["id"], b["id"]])
+
+    client.delete(f"/documents/{a['id']}")
+    c = add_document(client, pid, TEXT, title="c")
+    r = client.get(f"/reports/{pid}", headers={"If-None-Match": first.headers["ETag"]})
+    assert r.status_code == 200
+    assert sorted(x["document_id"] for x in r.json()) == sorted([b["id"], c["id"]])
+
+    client.put(f"/documents/{b['id']}", json={"title": "b renomeado"})
+    assert {x["title"] for x in client.get(f"/reports/{pid}").json()} == {"b renomeado", "c"}
+
+    # o run antigo continua consultável, sem o documento removido
+    old = client.get(f"/reports/{pid}/runs").json()[-1]
+    ids = [x["document_id"] for x in client.get(f"/reports/{pid}/runs/{old['id']}").json()]
+    assert ids == [b["id"]]
+
+    rows = client.get(f"/reports/{pid}/export?format=jsonl").text.splitlines()
+    assert len(rows) == 2
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from app.db import SessionLocal
+from app.models import Project
+from app.services.findings import Findings
+from app.services.rules import RuleRegistry, RulePackError, compile_pack
+from app.utils.normalize import normalize_text
+from conftest import add_document
+
+def _write_pack(path, name):
+    path.write_text(json.dumps({"name": name, "keywords": {"b": ["termo"]}}), encoding="utf-8")
+
+def test_registry_uses_declared_name(tmp_path):
+    _write_pack(tmp_path / "arquivo.json", "cliente_x")
+    reg = RuleRegistry([str(tmp_path)], reload_seconds=0)
+
+    assert reg.names() == ["cliente_x"]
+    assert reg.get("cliente_x").name == "cliente_x"
+    with pytest.raises(RulePackError):
+        reg.get("arquivo")
+
+def test_registry_follows_renamed_pack(tmp_path):
+    path = tmp_path / "p.json"
+    _write_pack(path, "antigo")
+    reg = RuleRegistry([str(tmp_path)], reload_seconds=0)
+    assert reg.get("antigo").name == "antigo"
+
+    _write_pack(path, "novo_nome_mais_longo")
+    assert reg.get("novo_nome_mais_longo").name == "novo_nome_mais_longo"
+    with pytest.raises(RulePackError):
+        reg.get("antigo")
+
+def test_missing_project_pack_is_a_conflict(client, project):
+    pid = project["id"]
+    add_document(client, pid, "texto com consentimento\n")
+    with SessionLocal() as db:
+        db.get(Project, pid).rule_pack = "pacote_removido"
+        db.commit()
+
+    assert client.post("/analyses/run", json={"project_id": pid}).status_code == 409
+    assert client.get(f"/reports/{pid}").status_code == 409
+    assert client.get(f"/reports/{pid}/export?source=live").status_code == 409
+
+def test_terms_match_whole_words_only():
+    pack = compile_pack(json.dumps({"name": "t", "keywords": {
+        "sod": ["sod"], "acesso": ["acesso"], "incidente": ["acesso indevido"], "desligamento": ["desligamento"],
+    }}).encode())
+    assert pack.keyword_hits(normalize_text("No episódio nada aconteceu.").text) == {}
+
+    text = "Acesso indevido após o desligamento (SoD)."
+    nt = normalize_text(text)
+    assert pack.keyword_hits(nt.text) == {
+        "sod": ["sod"], "acesso": ["acesso"], "incidente": ["acesso indevido"], "desligamento": ["desligamento"],
+    }
+    findings = Findings(text)
+    pack.keyword_spans(nt, findings)
+    assert findings.texts("kw:acesso") == ["Acesso"]
+    assert findings.texts("kw:incidente") == ["Acesso indevido"]
+    assert findings.texts("kw:sod") == ["SoD"]
@@ -0,0 +1,26 @@
+import pytest
+from pydantic import ValidationError
+
+from app.utils.serialization import DOC_RESULTS, _pick_encoding, accepted_encodings, encode
+
+def test_accepted_encodings_parses_tokens_and_q():
+    assert accepted_encodings("gzip, br;q=0, deflate;q=0.5") == {"gzip": 1.0, "br": 0.0, "deflate": 0.5}
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip, br;q=0", "gzip"),
+    ("br;q=0.2, gzip;q=0.8", "gzip"),
+    ("brotli-ish, gzip", "gzip"),  # "br" contido em outro token não conta
+    ("identity", None),
+    ("*;q=0", None),
+    ("*", "br"),
+    ("", None),
+])
+def test_pick_encoding(header, expected):
+    assert _pick_encoding(header) == expected
+
+def test_doc_results_enforce_the_contract():
+    ok = [{"document_id": 1, "title": "a", "created_at": None, "result": {"severidade": "baixo"}}]
+    assert encode(ok, DOC_RESULTS).startswith(b'[{"document_id":1')
+    with pytest.raises(ValidationError):
+        encode([{**ok[0], "document_id": None}], DOC_RESULTS)
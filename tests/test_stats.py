@@ -0,0 +1,86 @@
+from app.db import SessionLocal
+from app.models import ProjectStats
+from app.services import stats
+from conftest import add_document
+
+def _stats(client, pid):
+    r = client.get(f"/projects/{pid}/stats")
+    assert r.status_code == 200
+    return r.json()
+
+def test_counts_and_bytes_follow_document_writes(client, project):
+    pid = project["id"]
+    assert _stats(client, pid)["document_count"] == 0
+
+    a = add_document(client, pid, "abc\n")
+    add_document(client, pid, "ação\n")  # 7 bytes em UTF-8
+    s = _stats(client, pid)
+    assert (s["document_count"], s["total_bytes"]) == (2, 4 + 7)
+
+    client.put(f"/documents/{a['id']}", json={"content": "abcdef\n"})
+    assert _stats(client, pid)["total_bytes"] == 7 + 7
+
+    client.put(f"/documents/{a['id']}", json={"content": "página nova\n", "page": 2})
+    assert _stats(client, pid)["total_bytes"] == 7 + 7 + len("página nova\n".encode())
+
+    client.delete(f"/documents/{a['id']}")
+    s = _stats(client, pid)
+    assert (s["document_count"], s["total_bytes"]) == (1, 7)
+
+def test_title_edit_bumps_documents_revision_only(client, project):
+    pid = project["id"]
+    d = add_document(client, pid, "abc\n")
+    with SessionLocal() as db:
+        before = stats.documents_version(db, pid)
+
+    client.put(f"/documents/{d['id']}", json={"title": "outro título"})
+    with SessionLocal() as db:
+        assert stats.documents_version(db, pid) == before + 1
+    s = _stats(client, pid)
+    assert (s["document_count"], s["total_bytes"]) == (1, 4)
+
+def test_rebuild_matches_incremental_counters(client, project):
+    pid = project["id"]
+    add_document(client, pid, "abc\n")
+    add_document(client, pid, "CPF 123.456.789-09\n")
+    client.post("/analyses/run", json={"project_id": pid})
+    expected = _stats(client, pid)
+
+    with SessionLocal() as db:
+        row = db.get(ProjectStats, pid)
+        row.document_count, row.total_bytes, row.pii_totals = 0, 0, None
+        db.commit()
+        stats.rebuild_stats(db, pid)
+        db.commit()
+    assert _stats(client, pid) == expected
+
+def test_write_without_stats_row_rebuilds_it(client, project):
+    pid = project["id"]
+    add_document(client, pid, "abc\n")
+    with SessionLocal() as db:
+        db.delete(db.get(ProjectStats, pid))
+        db.commit()
+
+    add_document(client, pid, "de\n")
+    s = _stats(client, pid)
+    assert (s["document_count"], s["total_bytes"]) == (2, 4 + 3)
+
+def test_partial_run_keeps_project_totals(client, project):
+    pid = project["id"]
+    add_document(client, pid, "CPF 123.456.789-09\n")
+    b = add_document(client, pid, "email a@b.com\n")
+
+    client.post("/analyses/run", json={"project_id": pid})
+    full = _stats(client, pid)
+    assert full["pii_totals"] == {"cpf": 1, "email": 1}
+    assert sum(full["severity_histogram"].values()) == 2
+
+    client.put(f"/documents/{b['id']}", json={"content": "CPF 111.222.333-44 e 555.666.777-88\n"})
+    client.post("/analyses/run", json={"project_id": pid, "document_ids": [b["id"]]})
+    partial = _stats(client, pid)
+    assert partial["pii_totals"] == full["pii_totals"]
+    assert partial["severity_histogram"] == full["severity_histogram"]
+    assert partial["last_analysis_at"] > full["last_analysis_at"]
+
+    client.post("/analyses/run", json={"project_id": pid})
+    assert _stats(client, pid)["pii_totals"] == {"cpf": 3}